@@ -1,18 +1,23 @@
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import Response
+from fastapi.responses import JSONResponse, Response
+import asyncio
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 from starlette.responses import HTMLResponse, RedirectResponse
 from uvicorn import run as app_run
-from typing import Optional
 from pathlib import Path
 import os
 
 # Importing constants and pipeline modules from the project (update these if your classes have different names)
 from src.constants import APP_HOST, APP_PORT
-from src.pipeline.prediction_pipeline import VehicleData, VehicleDataClassifier  # <-- Renamed to match your context (e.g., bike rental demand)
-from src.pipeline.training_pipeline import TrainPipeline
+from src.pipeline.prediction_pipeline import VehicleBatchData, VehicleDataClassifier  # <-- Renamed to match your context (e.g., bike rental demand)
+from src.pipeline.request_coalescer import PredictionCoalescer
+from src.pipeline.executors import get_prediction_executor, get_training_executor, shutdown_executors
+from src.pipeline.training_jobs import TrainingJobManager
+from src.entity.config_entity import VehiclePredictorConfig
+from src.entity.feature_vector import BikeFeatureVector
+from src.logger import logging
 
 # Initialize FastAPI application
 app = FastAPI()
@@ -40,69 +45,32 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-class DataForm:
+# Concurrent single-row form predictions are coalesced into one batched model call
+predictor_config = VehiclePredictorConfig()
+prediction_coalescer = PredictionCoalescer(
+    predict_fn=lambda features: VehicleDataClassifier().predict_array(features, BikeFeatureVector.COLUMNS),
+    window_ms=predictor_config.coalesce_window_ms,
+    max_batch_size=predictor_config.coalesce_max_batch_size,
+    executor=get_prediction_executor,
+)
+
+# Load the production model once per worker so the first request does not pay for the S3 download
+@app.on_event("startup")
+async def load_model_on_startup():
     """
-    DataForm class to handle and process incoming form data.
-    This class defines the bike rental-related attributes expected from the form.
+    Warms the process-wide model cache and starts the prediction coalescer at worker startup.
     """
-    def __init__(self, request: Request):
-        self.request: Request = request
-        self.Hour: Optional[int] = None
-        self.Temperature: Optional[float] = None
-        self.Humidity: Optional[int] = None
-        self.Wind_speed: Optional[float] = None
-        self.Visibility: Optional[int] = None
-        self.dew_point_temperature: Optional[float] = None
-        self.Solar_Radiation: Optional[float] = None
-        self.Rainfall: Optional[float] = None
-        self.snowfall: Optional[float] = None
-        self.month: Optional[int] = None
-        self.day: Optional[int] = None
-        self.Seasons_Autumn: Optional[int] = None
-        self.Seasons_Spring: Optional[int] = None
-        self.Seasons_Summer: Optional[int] = None
-        self.Seasons_Winter: Optional[int] = None
-        self.Holiday_No_Holiday: Optional[int] = None
-        self.Functioning_Day_Yes: Optional[int] = None
-               
-    async def get_bike_data(self):
-        """
-        Method to retrieve and assign form data to class attributes.
-        This method is asynchronous to handle form data fetching without blocking.
-        """
-        form = await self.request.form()
-
-        def to_int(value, default=0):
-            try:
-                return int(value)
-            except Exception:
-                return default
-
-        def to_float(value, default=0.0):
-            try:
-                return float(value)
-            except Exception:
-                return default
-
-        self.Hour = to_int(form.get("Hour"))
-        self.Temperature = to_float(form.get("Temperature"))
-        self.Humidity = to_int(form.get("Humidity"))
-        self.Wind_speed = to_float(form.get("Wind_speed"))
-        self.Visibility = to_int(form.get("Visibility"))
-        self.dew_point_temperature = to_float(form.get("dew_point_temperature"))
-        self.Solar_Radiation = to_float(form.get("Solar_Radiation"))
-        self.Rainfall = to_float(form.get("Rainfall"))
-        self.snowfall = to_float(form.get("snowfall"))
-        self.month = to_int(form.get("month"))
-        self.day = to_int(form.get("day"))
-
-        # categorical/binary flags (0 or 1)
-        self.Seasons_Autumn = to_int(form.get("Seasons_Autumn"))
-        self.Seasons_Spring = to_int(form.get("Seasons_Spring"))
-        self.Seasons_Summer = to_int(form.get("Seasons_Summer"))
-        self.Seasons_Winter = to_int(form.get("Seasons_Winter"))
-        self.Holiday_No_Holiday = to_int(form.get("Holiday_No_Holiday"))
-        self.Functioning_Day_Yes = to_int(form.get("Functioning_Day_Yes"))
+    await prediction_coalescer.start()
+    try:
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(get_prediction_executor(), lambda: VehicleDataClassifier().model_cache.warm())
+    except Exception as e:
+        logging.warning(f"Could not preload model at startup, it will be loaded on first request: {e}")
+
+@app.on_event("shutdown")
+async def stop_prediction_coalescer():
+    await prediction_coalescer.stop()
+    shutdown_executors()
 
 # Route to render the main page with the form
 @app.get("/", tags=["authentication"])
@@ -113,18 +81,53 @@ async def index(request: Request):
     return templates.TemplateResponse(
             "data.html", {"request": request, "context": "Rendering"})  # use existing template file
 
-# Route to trigger the model training process
-@app.get("/train")
+# Training jobs run in their own process; their status is shared with every worker through job files
+training_job_manager = TrainingJobManager()
+
+async def _submit_training_job() -> JSONResponse:
+    # submit() may wait on another worker's submit lock and spawns a process, so it runs on the
+    # training pool to keep this worker's event loop serving predictions meanwhile
+    try:
+        loop = asyncio.get_running_loop()
+        job = await loop.run_in_executor(get_training_executor(), training_job_manager.submit)
+        return JSONResponse(job, status_code=202)
+    except RuntimeError as e:
+        return JSONResponse({"status": False, "error": f"{e}"}, status_code=409)
+    except Exception as e:
+        return JSONResponse({"status": False, "error": f"{e}"}, status_code=500)
+
+# Route to start a training job without waiting for it to finish
+@app.post("/train")
+async def submitTrainingJob():
+    """
+    Starts the training pipeline in a separate process and returns the job id immediately.
+    Poll GET /train/{job_id} for per-stage status.
+    """
+    return await _submit_training_job()
+
+# Deprecated: GET /train used to run the whole pipeline in the request and answer
+# "Training successful!!!". It now submits a job exactly like POST /train and answers 202
+# with the job status; it is kept only for existing clients and will be removed.
+@app.get("/train", deprecated=True)
 async def trainRouteClient():
     """
-    Endpoint to initiate the model training pipeline.
+    Deprecated alias of POST /train.
     """
-    try:
-        train_pipeline = TrainPipeline()
-        train_pipeline.run_pipeline()
-        return Response("Training successful!!!")
-    except Exception as e:
-        return Response(f"Error Occurred! {e}")
+    logging.warning("GET /train is deprecated, use POST /train")
+    response = await _submit_training_job()
+    response.headers["Deprecation"] = "true"
+    return response
+
+# Route to report the status of a training job
+@app.get("/train/{job_id}")
+async def trainingJobStatus(job_id: str):
+    """
+    Returns the overall and per-stage status (with timings) of a training job.
+    """
+    job = training_job_manager.get_status(job_id)
+    if job is None:
+        return JSONResponse({"status": False, "error": f"Training job {job_id} not found"}, status_code=404)
+    return JSONResponse(job)
 
 # Route to handle form submission and make predictions
 @app.post("/")
@@ -133,37 +136,13 @@ async def predictRouteClient(request: Request):
     Endpoint to receive form data, process it, and make a prediction.
     """
     try:
-        form = DataForm(request)
-        await form.get_bike_data()
-       
-        bike_data = VehicleData(  # <-- Update class name to match your prediction_pipeline
-            Hour=form.Hour,
-            Temperature=form.Temperature,
-            Humidity=form.Humidity,
-            Wind_speed=form.Wind_speed,
-            Visibility=form.Visibility,
-            dew_point_temperature=form.dew_point_temperature,
-            Solar_Radiation=form.Solar_Radiation,
-            Rainfall=form.Rainfall,
-            snowfall=form.snowfall,
-            month=form.month,
-            day=form.day,
-            Seasons_Autumn=form.Seasons_Autumn,
-            Seasons_Spring=form.Seasons_Spring,
-            Seasons_Summer=form.Seasons_Summer,
-            Seasons_Winter=form.Seasons_Winter,
-            Holiday_No_Holiday=form.Holiday_No_Holiday,
-            Functioning_Day_Yes=form.Functioning_Day_Yes
-        )
-        
-        # Convert form data into a DataFrame for the model
-        bike_df = bike_data.get_vehicle_input_data_frame()
-        
-        # Initialize the prediction pipeline
-        model_predictor = VehicleDataClassifier()  # <-- Update class name
-        
-        # Make a prediction and retrieve the result
-        value = model_predictor.predict(dataframe=bike_df)[0]
+        form = await request.form()
+
+        # Parse the form straight into a float64 feature row (no intermediate objects or DataFrame)
+        feature_vector = BikeFeatureVector.from_mapping(form)
+
+        # Make a prediction (batched with concurrent requests) and retrieve the result
+        value = (await prediction_coalescer.submit(feature_vector.as_matrix()))[0]
 
         # Round the prediction to the nearest integer (rental counts are whole numbers)
         try:
@@ -183,6 +162,31 @@ async def predictRouteClient(request: Request):
     except Exception as e:
         return {"status": False, "error": f"{e}"}
 
+# Route to score many feature rows in a single vectorized model call
+@app.post("/predict/batch")
+async def predictBatchRouteClient(request: Request):
+    """
+    Endpoint to receive a JSON batch of feature rows (row objects or columnar arrays)
+    and return one prediction per row, computed with a single model predict call.
+    """
+    try:
+        payload = await request.json()
+        batch_data = VehicleBatchData.from_payload(payload)
+        bike_df = batch_data.get_vehicle_input_data_frame()
+
+        model_predictor = VehicleDataClassifier()
+        loop = asyncio.get_running_loop()
+        predictions = await loop.run_in_executor(get_prediction_executor(), model_predictor.predict, bike_df)
+
+        return JSONResponse({
+            "status": True,
+            "count": len(predictions),
+            "predictions": [float(value) for value in predictions],
+        })
+
+    except Exception as e:
+        return {"status": False, "error": f"{e}"}
+
 # Main entry point to start the FastAPI server
 if __name__ == "__main__":
     app_run(app, host=APP_HOST, port=APP_PORT)
\ No newline at end of file
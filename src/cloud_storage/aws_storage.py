@@ -1,7 +1,7 @@
 import boto3
 from src.configuration.aws_connection import S3Client
 from io import StringIO
-from typing import Union,List
+from typing import Union,List,Iterator
 import os,sys
 from src.logger import logging
 from mypy_boto3_s3.service_resource import Bucket
@@ -28,7 +28,8 @@ class SimpleStorageService:
 
     def s3_key_path_available(self, bucket_name, s3_key) -> bool:
         """
-        Checks if a specified S3 key path (file path) is available in the specified bucket.
+        Checks if the exact S3 key (file path) exists in the specified bucket, using a
+        single HEAD request. Keys that merely share the prefix (e.g. model.pkl.bak) do not count.
 
         Args:
             bucket_name (str): Name of the S3 bucket.
@@ -38,12 +39,88 @@ class SimpleStorageService:
             bool: True if the file exists, False otherwise.
         """
         try:
-            bucket = self.get_bucket(bucket_name)
-            file_objects = [file_object for file_object in bucket.objects.filter(Prefix=s3_key)]
-            return len(file_objects) > 0
+            return self.get_object_etag(bucket_name=bucket_name, s3_key=s3_key) is not None
         except Exception as e:
             raise MyException(e, sys)
 
+    def s3_prefix_available(self, bucket_name: str, prefix: str) -> bool:
+        """
+        Checks if at least one object exists under the given prefix, fetching a single key.
+
+        Args:
+            bucket_name (str): Name of the S3 bucket.
+            prefix (str): Key prefix to check.
+
+        Returns:
+            bool: True if any object has the prefix, False otherwise.
+        """
+        try:
+            response = self.s3_client.list_objects_v2(Bucket=bucket_name, Prefix=prefix, MaxKeys=1)
+            return response.get("KeyCount", 0) > 0
+        except Exception as e:
+            raise MyException(e, sys) from e
+
+    def iter_objects(self, bucket_name: str, prefix: str = "", page_size: int = 1000) -> Iterator[dict]:
+        """
+        Lazily iterates over the objects under a prefix, one listing page at a time,
+        without materializing the whole listing.
+
+        Args:
+            bucket_name (str): Name of the S3 bucket.
+            prefix (str): Key prefix to list.
+            page_size (int): Number of keys requested per listing call.
+
+        Yields:
+            dict: Object summary with Key, ETag, Size and LastModified.
+        """
+        try:
+            paginator = self.s3_client.get_paginator("list_objects_v2")
+            for page in paginator.paginate(Bucket=bucket_name, Prefix=prefix,
+                                           PaginationConfig={"PageSize": page_size}):
+                for object_summary in page.get("Contents", []):
+                    yield object_summary
+        except Exception as e:
+            raise MyException(e, sys) from e
+
+    def head_object(self, bucket_name: str, s3_key: str) -> Union[dict, None]:
+        """
+        Returns the ETag and server-side encryption of the specified S3 object with a single
+        HEAD request, without downloading its content. SSE-KMS objects ("aws:kms") have ETags
+        that are not the MD5 of their content.
+
+        Args:
+            bucket_name (str): Name of the S3 bucket.
+            s3_key (str): Key path of the object.
+
+        Returns:
+            Union[dict, None]: {"etag", "server_side_encryption"}, or None if the object does not exist.
+        """
+        try:
+            response = self.s3_client.head_object(Bucket=bucket_name, Key=s3_key)
+            return {"etag": response["ETag"].strip('"'),
+                    "server_side_encryption": response.get("ServerSideEncryption")}
+        except ClientError as e:
+            if e.response["Error"]["Code"] in ("404", "NoSuchKey", "NotFound"):
+                return None
+            raise MyException(e, sys) from e
+        except Exception as e:
+            raise MyException(e, sys) from e
+
+    def get_object_etag(self, bucket_name: str, s3_key: str) -> Union[str, None]:
+        """
+        Returns the ETag of the specified S3 object using a HEAD request, without
+        downloading its content.
+
+        Args:
+            bucket_name (str): Name of the S3 bucket.
+            s3_key (str): Key path of the object.
+
+        Returns:
+            Union[str, None]: The object's ETag, or None if the object does not exist.
+        """
+        head = self.head_object(bucket_name=bucket_name, s3_key=s3_key)
+        return head["etag"] if head is not None else None
+
     @staticmethod
     def read_object(object_name: str, decode: bool = True, make_readable: bool = False) -> Union[StringIO, str]:
         """
@@ -89,25 +166,29 @@ class SimpleStorageService:
         except Exception as e:
             raise MyException(e, sys) from e
 
-    def get_file_object(self, filename: str, bucket_name: str) -> Union[List[object], object]:
+    def get_file_object(self, filename: str, bucket_name: str) -> object:
         """
-        Retrieves the file object(s) from the specified bucket based on the filename.
+        Retrieves the S3 object stored under the exact key filename.
+        The existence check is a single HEAD request; no bucket listing is performed.
 
         Args:
-            filename (str): The name of the file to retrieve.
+            filename (str): The key of the file to retrieve.
             bucket_name (str): The name of the S3 bucket.
 
         Returns:
-            Union[List[object], object]: The S3 file object or list of file objects.
+            object: The S3 object.
         """
         logging.info("Entered the get_file_object method of SimpleStorageService class")
         try:
-            bucket = self.get_bucket(bucket_name)
-            file_objects = [file_object for file_object in bucket.objects.filter(Prefix=filename)]
-            func = lambda x: x[0] if len(x) == 1 else x
-            file_objs = func(file_objects)
+            file_object = self.s3_resource.Object(bucket_name, filename)
+            try:
+                file_object.load()
+            except ClientError as e:
+                if e.response["Error"]["Code"] in ("404", "NoSuchKey", "NotFound"):
+                    raise FileNotFoundError(f"{filename} not found in bucket {bucket_name}") from e
+                raise
             logging.info("Exited the get_file_object method of SimpleStorageService class")
-            return file_objs
+            return file_object
         except Exception as e:
             raise MyException(e, sys) from e
 
@@ -176,6 +257,23 @@ class SimpleStorageService:
         except Exception as e:
             raise MyException(e, sys) from e
 
+    def download_file(self, s3_key: str, to_filename: str, bucket_name: str) -> None:
+        """
+        Downloads an S3 object straight to a local file.
+
+        Args:
+            s3_key (str): Key path of the object in the bucket.
+            to_filename (str): Local file path to write.
+            bucket_name (str): Name of the S3 bucket.
+        """
+        logging.info("Entered the download_file method of SimpleStorageService class")
+        try:
+            logging.info(f"Downloading {s3_key} from {bucket_name} to {to_filename}")
+            self.s3_client.download_file(bucket_name, s3_key, to_filename)
+            logging.info("Exited the download_file method of SimpleStorageService class")
+        except Exception as e:
+            raise MyException(e, sys) from e
+
     def upload_df_as_csv(self, data_frame: DataFrame, local_filename: str, bucket_filename: str, bucket_name: str) -> None:
         """
         Uploads a DataFrame as a CSV file to the specified S3 bucket.
@@ -0,0 +1,120 @@
+import hashlib
+import os
+import shutil
+import sys
+import time
+from typing import Callable, List, Optional
+
+from src.constants import MODEL_CACHE_DIR, MODEL_CACHE_MAX_VERSIONS, MODEL_CACHE_VERSIONS_DIR_NAME
+from src.exception import MyException
+from src.logger import logging
+
+
+class LocalModelCache:
+    """
+    On-disk cache of downloaded model files, one directory per model version (S3 ETag):
+
+        <cache_dir>/versions/<etag>/<model file>
+
+    Files are downloaded under a temporary name, checked against the ETag (the object's MD5
+    for single-part uploads) and renamed into place, so a reader never sees a partial file. Every access refreshes the version's
+    mtime, and only the max_versions most recently used versions are kept.
+    """
+
+    def __init__(self, cache_dir: str = MODEL_CACHE_DIR, max_versions: int = MODEL_CACHE_MAX_VERSIONS):
+        """
+        :param cache_dir: Root directory of the local model cache
+        :param max_versions: Number of model versions kept on disk
+        """
+        self.cache_dir = cache_dir
+        self.versions_dir = os.path.join(cache_dir, MODEL_CACHE_VERSIONS_DIR_NAME)
+        self.max_versions = max_versions
+
+    @staticmethod
+    def _safe_name(version: str) -> str:
+        return "".join(c if c.isalnum() or c in "-_" else "_" for c in version)
+
+    def version_dir(self, version: str) -> str:
+        return os.path.join(self.versions_dir, self._safe_name(version))
+
+    def _touch(self, version: str) -> None:
+        try:
+            os.utime(self.version_dir(version))
+        except OSError:
+            pass
+
+    def get_model_file(self, version: str, file_name: str) -> Optional[str]:
+        """
+        Returns the cached file path for this version, or None on a cache miss.
+        """
+        file_path = os.path.join(self.version_dir(version), file_name)
+        if not os.path.exists(file_path):
+            return None
+        self._touch(version)
+        logging.info(f"Model version {version} found in local cache")
+        return file_path
+
+    @staticmethod
+    def matches_etag(file_path: str, etag: str) -> bool:
+        """
+        Checks a downloaded file against its ETag. Multipart ETags ("<md5>-<parts>") are
+        not plain content hashes and are accepted as is.
+        """
+        if "-" in etag:
+            return True
+        md5 = hashlib.md5()
+        with open(file_path, "rb") as file_obj:
+            for chunk in iter(lambda: file_obj.read(1024 * 1024), b""):
+                md5.update(chunk)
+        return md5.hexdigest() == etag
+
+    def put_model_file(self, version: str, file_name: str, download_fn: Callable[[str], None],
+                       etag_is_md5: bool = True) -> str:
+        """
+        Downloads a model version into the cache with download_fn(local_path) and returns its path.
+        :param etag_is_md5: False for objects whose ETag is not a content MD5 (SSE-KMS); their
+                            download is not checked. Otherwise a mismatching download is discarded.
+        """
+        try:
+            directory = self.version_dir(version)
+            os.makedirs(directory, exist_ok=True)
+            file_path = os.path.join(directory, file_name)
+            tmp_file_path = f"{file_path}.{os.getpid()}.tmp"
+
+            started = time.monotonic()
+            download_fn(tmp_file_path)
+            if etag_is_md5 and not self.matches_etag(tmp_file_path, version):
+                os.remove(tmp_file_path)
+                raise ValueError(f"Downloaded model {file_name} does not match its ETag {version}")
+            os.replace(tmp_file_path, file_path)
+            logging.info(f"Cached model version {version} in {time.monotonic() - started:.1f}s")
+
+            self._touch(version)
+            self.evict()
+            return file_path
+        except Exception as e:
+            raise MyException(e, sys) from e
+
+    def list_versions(self) -> List[str]:
+        """
+        Returns cached version directory names, most recently used first.
+        """
+        if not os.path.isdir(self.versions_dir):
+            return []
+        versions = [name for name in os.listdir(self.versions_dir)
+                    if os.path.isdir(os.path.join(self.versions_dir, name))]
+        versions.sort(key=lambda name: os.path.getmtime(os.path.join(self.versions_dir, name)), reverse=True)
+        return versions
+
+    def latest_version(self) -> Optional[str]:
+        versions = self.list_versions()
+        return versions[0] if versions else None
+
+    def evict(self) -> None:
+        """
+        Removes all but the max_versions most recently used versions.
+        """
+        for version in self.list_versions()[self.max_versions:]:
+            logging.info(f"Evicting model version {version} from local cache")
+            # Files still memory-mapped by other workers stay readable until they are unmapped
+            shutil.rmtree(os.path.join(self.versions_dir, version), ignore_errors=True)
@@ -3,7 +3,6 @@ import sys
 
 
 import pandas as pd
-from sklearn.model_selection import train_test_split
 
 
 from src.entity.config_entity import DataIngestionConfig
@@ -11,17 +10,39 @@ from src.entity.artifact_entity import DataIngestionArtifact
 from src.exception import MyException
 from src.logger import logging
 from src.data_access.proj1_data import Source_Connectors
+from src.data_access.local_dataset import PartitionedDataset
+from src.constants import (DATA_INGESTION_DATE_COLUMN, DATA_INGESTION_HOUR_COLUMN, DATA_INGESTION_DATE_FORMAT,
+                           DATA_INGESTION_SQL_DATE_FORMAT, SCHEMA_FILE_PATH)
+from src.utils.main_utils import read_yaml_file, write_dataframe, DataFrameAppender
+from src.utils.artifact_writer import ArtifactWriter, write_artifact
+from src.utils.date_features import DateFeatureExtractor
 
 
 class DataIngestion:
-    def __init__(self,data_ingestion_config:DataIngestionConfig=DataIngestionConfig()):
+    def __init__(self,data_ingestion_config:DataIngestionConfig=DataIngestionConfig(),
+                 artifact_writer:ArtifactWriter=None):
         """
         :param data_ingestion_config: configuration for data ingestion
+        :param artifact_writer: if given, the splits are returned in the artifact and written in the background
         """
         try:
             self.data_ingestion_config = data_ingestion_config
+            self.artifact_writer = artifact_writer
+            self._schema_config = read_yaml_file(file_path=SCHEMA_FILE_PATH)
+            self._date_extractor = DateFeatureExtractor(date_format=DATA_INGESTION_DATE_FORMAT)
         except Exception as e:
             raise MyException(e,sys)
+
+
+    def apply_schema_dtypes(self, dataframe: pd.DataFrame) -> pd.DataFrame:
+        """
+        Cast the schema's categorical columns to the pandas category dtype so typed
+        artifact formats (parquet) keep them as dictionary-encoded categories
+        """
+        for column in self._schema_config["categorical_columns"]:
+            if column in dataframe.columns:
+                dataframe[column] = dataframe[column].astype("category")
+        return dataframe
        
 
 
@@ -52,17 +73,86 @@ class DataIngestion:
             raise MyException(e,sys)
 
 
-    def split_data_as_train_test(self,dataframe: pd.DataFrame) ->None:
+    def get_test_start_date(self, date_counts: pd.Series) -> pd.Timestamp:
+        """
+        Method Name :   get_test_start_date
+        Description :   Picks the first date of the test period: the latest dates that together hold at
+                        least train_test_split_ratio of the rows. Each date goes wholly to one split and
+                        the earliest date always stays in the train split
+
+        Output      :   Returns the earliest date of the test split
+        """
+        date_counts = date_counts.sort_index()
+        if len(date_counts) < 2:
+            raise ValueError(f"Need rows from at least 2 dates for a time-based split, got {len(date_counts)}")
+        n_test_rows = self.data_ingestion_config.train_test_split_ratio * date_counts.sum()
+        rows_from_date = date_counts[::-1].cumsum()[::-1]
+        test_start_date = rows_from_date[rows_from_date >= n_test_rows].index.max()
+        return max(test_start_date, date_counts.index[1])
+
+
+    def fetch_date_counts(self, connector: Source_Connectors) -> pd.Series:
+        """
+        Returns the number of source rows per date, aggregated in the warehouse
+        """
+        counts_df = connector.fetch_dataframe(
+            f"SELECT `{DATA_INGESTION_DATE_COLUMN}` AS date, COUNT(*) AS n_rows "
+            f"FROM {connector.full_table_name} GROUP BY `{DATA_INGESTION_DATE_COLUMN}`;")
+        dates = self._date_extractor.parse(counts_df["date"])
+        return pd.Series(counts_df["n_rows"].to_numpy(), index=dates.to_numpy()).groupby(level=0).sum()
+
+
+    def get_source_state(self) -> dict:
+        """
+        Method Name :   get_source_state
+        Description :   Row count and latest Date and Hour of the source table, from one aggregate query.
+                        New or deleted rows change it, so it keys the cached ingestion output
+
+        Output      :   Returns {"n_rows", "max_date", "max_hour"}
+        """
+        try:
+            connector = Source_Connectors()
+            date_expr = f"to_date(`{DATA_INGESTION_DATE_COLUMN}`, '{DATA_INGESTION_SQL_DATE_FORMAT}')"
+            state_df = connector.fetch_dataframe(
+                f"SELECT COUNT(*) AS n_rows, MAX({date_expr}) AS max_date, "
+                f"MAX(`{DATA_INGESTION_HOUR_COLUMN}`) AS max_hour "
+                f"FROM {connector.full_table_name};")
+            state = state_df.iloc[0]
+            return {"n_rows": int(state["n_rows"]), "max_date": str(state["max_date"]), "max_hour": int(state["max_hour"])}
+        except Exception as e:
+            raise MyException(e, sys) from e
+
+
+    def sort_by_time(self, dataframe: pd.DataFrame) -> pd.DataFrame:
+        """
+        Orders rows by (Date, Hour). Model selection and early stopping hold out the latest
+        training rows, which only works if the split files are in time order
+        """
+        dates = self._date_extractor.parse(dataframe[DATA_INGESTION_DATE_COLUMN])
+        order = pd.DataFrame({"date": dates.to_numpy(), "hour": dataframe[DATA_INGESTION_HOUR_COLUMN].to_numpy()})
+        return dataframe.iloc[order.sort_values(["date", "hour"], kind="stable").index]
+
+
+    def split_data_as_train_test(self,dataframe: pd.DataFrame) ->tuple:
         """
         Method Name :   split_data_as_train_test
-        Description :   This method splits the dataframe into train set and test set based on split ratio
+        Description :   This method splits the dataframe by date: the latest period, holding about
+                        train_test_split_ratio of the rows, is the test set and everything before it
+                        the train set, so the test set only holds days the model has not seen.
+                        Both sets are written in time order
+
+        Output      :   Returns the (train_set, test_set) DataFrames that were written
         """
         logging.info("Entered split_data_as_train_test method of Data_Ingestion class")
 
 
         try:
-            train_set, test_set = train_test_split(dataframe, test_size=self.data_ingestion_config.train_test_split_ratio)
-            logging.info("Performed train test split on the dataframe")
+            dataframe = self.sort_by_time(dataframe)
+            dates = self._date_extractor.parse(dataframe[DATA_INGESTION_DATE_COLUMN])
+            test_start_date = self.get_test_start_date(dates.value_counts())
+            is_test = (dates >= test_start_date).to_numpy()
+            train_set, test_set = dataframe[~is_test], dataframe[is_test]
+            logging.info(f"Performed train test split on the dataframe, test set starts {test_start_date:%Y-%m-%d}")
             logging.info(
                 "Exited split_data_as_train_test method of Data_Ingestion class"
             )
@@ -70,11 +160,115 @@ class DataIngestion:
             os.makedirs(dir_path,exist_ok=True)
            
             logging.info(f"Exporting train and test file path.")
-            train_set.to_csv(self.data_ingestion_config.training_file_path,index=False,header=True)
-            test_set.to_csv(self.data_ingestion_config.testing_file_path,index=False,header=True)
+            file_format = self.data_ingestion_config.file_format
+            train_set, test_set = self.apply_schema_dtypes(train_set), self.apply_schema_dtypes(test_set)
+            write_artifact(self.artifact_writer, write_dataframe, train_set, self.data_ingestion_config.training_file_path, file_format)
+            write_artifact(self.artifact_writer, write_dataframe, test_set, self.data_ingestion_config.testing_file_path, file_format)
 
 
             logging.info(f"Exported train and test file path.")
+            return train_set, test_set
+        except Exception as e:
+            raise MyException(e, sys) from e
+
+
+    def stream_data_into_train_test(self, batches=None, date_counts: pd.Series = None) -> None:
+        """
+        Method Name :   stream_data_into_train_test
+        Description :   This method splits/writes each incoming batch to the train and test files as it
+                        arrives, so only one batch is held in memory at a time. By default the batches
+                        are Arrow record batches fetched from the source table. Rows are split by date
+                        as in split_data_as_train_test, with the cutoff taken from the rows per date.
+                        The batches must arrive oldest first (the source query orders them) for the
+                        files to be in time order; rows within a batch are sorted here
+
+        :param date_counts: Rows per date of all the batches; fetched from the source table when
+                            batches is None and required otherwise
+        """
+        logging.info("Entered stream_data_into_train_test method of Data_Ingestion class")
+
+
+        try:
+            file_format = self.data_ingestion_config.file_format
+            train_appender = DataFrameAppender(self.data_ingestion_config.training_file_path, file_format)
+            test_appender = DataFrameAppender(self.data_ingestion_config.testing_file_path, file_format)
+
+            if batches is None:
+                connector = Source_Connectors()
+                date_counts = self.fetch_date_counts(connector)
+                date_expr = f"to_date(`{DATA_INGESTION_DATE_COLUMN}`, '{DATA_INGESTION_SQL_DATE_FORMAT}')"
+                query = (f"SELECT * FROM {connector.full_table_name} "
+                         f"ORDER BY {date_expr}, `{DATA_INGESTION_HOUR_COLUMN}`;")
+                batches = (arrow_batch.to_pandas() for arrow_batch in
+                           connector.iter_record_batches(sql_query=query, batch_size=self.data_ingestion_config.batch_size))
+            if date_counts is None:
+                raise ValueError("date_counts is required when batches are given")
+            test_start_date = self.get_test_start_date(date_counts)
+            logging.info(f"Test set starts {test_start_date:%Y-%m-%d}")
+
+            n_train, n_test, n_batches = 0, 0, 0
+            for batch_df in batches:
+                batch_df = self.apply_schema_dtypes(self.sort_by_time(batch_df))
+                is_test = (self._date_extractor.parse(batch_df[DATA_INGESTION_DATE_COLUMN]) >= test_start_date).to_numpy()
+
+                train_appender.append(batch_df[~is_test])
+                test_appender.append(batch_df[is_test])
+
+                n_test += int(is_test.sum())
+                n_train += len(batch_df) - int(is_test.sum())
+                n_batches += 1
+                logging.info(f"Ingested batch {n_batches} with {len(batch_df)} rows")
+
+            train_appender.close()
+            test_appender.close()
+            logging.info(f"Streamed {n_batches} batches: {n_train} train rows, {n_test} test rows")
+            logging.info("Exited stream_data_into_train_test method of Data_Ingestion class")
+        except Exception as e:
+            raise MyException(e, sys) from e
+
+
+    def build_incremental_query(self, full_table_name: str, watermark: dict) -> str:
+        """
+        Returns the query selecting only rows newer than the (date, hour) watermark
+        """
+        date_expr = f"to_date(`{DATA_INGESTION_DATE_COLUMN}`, '{DATA_INGESTION_SQL_DATE_FORMAT}')"
+        hour_col = f"`{DATA_INGESTION_HOUR_COLUMN}`"
+        return (f"SELECT * FROM {full_table_name} "
+                f"WHERE {date_expr} > DATE'{watermark['date']}' "
+                f"OR ({date_expr} = DATE'{watermark['date']}' AND {hour_col} > {int(watermark['hour'])});")
+
+
+    def sync_incremental_dataset(self, dataset: PartitionedDataset) -> None:
+        """
+        Method Name :   sync_incremental_dataset
+        Description :   This method fetches only the rows newer than the stored high-water mark
+                        (the whole table on the first run), merges them into the local partitioned
+                        dataset and then advances the watermark
+        """
+        logging.info("Entered sync_incremental_dataset method of Data_Ingestion class")
+
+
+        try:
+            connector = Source_Connectors()
+            watermark = dataset.read_watermark()
+            query = None if watermark is None else self.build_incremental_query(connector.full_table_name, watermark)
+            logging.info(f"Current watermark: {watermark}")
+
+            new_watermark, n_rows = watermark, 0
+            for arrow_batch in connector.iter_record_batches(sql_query=query, batch_size=self.data_ingestion_config.batch_size):
+                batch_df = arrow_batch.to_pandas()
+                batch_watermark = dataset.append(batch_df)
+                if batch_watermark is not None and (new_watermark is None or
+                        (batch_watermark["date"], batch_watermark["hour"]) > (new_watermark["date"], new_watermark["hour"])):
+                    new_watermark = batch_watermark
+                n_rows += len(batch_df)
+
+            # The watermark only moves once every fetched row is stored; a crash before this
+            # point re-fetches the same rows, which the key-based merge de-duplicates
+            if n_rows > 0:
+                dataset.write_watermark(new_watermark)
+            logging.info(f"Fetched {n_rows} new rows, watermark is now {new_watermark}")
+            logging.info("Exited sync_incremental_dataset method of Data_Ingestion class")
         except Exception as e:
             raise MyException(e, sys) from e
 
@@ -88,13 +282,25 @@ class DataIngestion:
 
 
         try:
-            dataframe = self.export_data_into_feature_store()
+            train_set, test_set = None, None
+            if self.data_ingestion_config.incremental:
+                dataset = PartitionedDataset(dataset_dir=self.data_ingestion_config.dataset_dir,
+                                             watermark_file_path=self.data_ingestion_config.watermark_file_path)
+                self.sync_incremental_dataset(dataset)
+                if self.data_ingestion_config.streaming:
+                    self.stream_data_into_train_test(batches=dataset.iter_partitions(), date_counts=dataset.date_counts())
+                else:
+                    train_set, test_set = self.split_data_as_train_test(dataset.read_all())
+            elif self.data_ingestion_config.streaming:
+                self.stream_data_into_train_test()
+            else:
+                dataframe = self.export_data_into_feature_store()
 
 
-            logging.info("Got the data from source connector")
+                logging.info("Got the data from source connector")
 
 
-            self.split_data_as_train_test(dataframe)
+                train_set, test_set = self.split_data_as_train_test(dataframe)
 
 
             logging.info("Performed train test split on the dataset")
@@ -106,7 +312,11 @@ class DataIngestion:
 
 
             data_ingestion_artifact = DataIngestionArtifact(trained_file_path=self.data_ingestion_config.training_file_path,
-            test_file_path=self.data_ingestion_config.testing_file_path)
+            test_file_path=self.data_ingestion_config.testing_file_path,
+            file_format=self.data_ingestion_config.file_format)
+            if self.artifact_writer is not None:
+                # Streaming ingestion never holds the full splits, so they stay None there
+                data_ingestion_artifact.train_df, data_ingestion_artifact.test_df = train_set, test_set
            
             logging.info(f"Data ingestion artifact: {data_ingestion_artifact}")
             return data_ingestion_artifact
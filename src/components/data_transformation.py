@@ -12,8 +12,10 @@ from src.entity.config_entity import DataTransformationConfig
 from src.entity.artifact_entity import DataTransformationArtifact, DataIngestionArtifact, DataValidationArtifact
 from src.exception import MyException
 from src.logger import logging
-from src.utils.main_utils import save_object, save_numpy_array_data, read_yaml_file
+from src.utils.main_utils import save_object, save_numpy_array_data, read_yaml_file, read_dataframe
 from src.utils.main_utils import write_yaml_file
+from src.utils.artifact_writer import ArtifactWriter, write_artifact
+from src.entity.feature_transformer import BikeFeatureTransformer
 import json
 
 
@@ -22,8 +24,13 @@ import json
 class dataTransformation:
     def __init__(self,data_ingestion_artifact:DataIngestionArtifact,
                  data_transformation_config:DataTransformationConfig,
-                 data_validation_artifact:DataValidationArtifact):
+                 data_validation_artifact:DataValidationArtifact,
+                 artifact_writer:ArtifactWriter=None):
+        """
+        :param artifact_writer: if given, the arrays are returned in the artifact and written in the background
+        """
         try:
+            self.artifact_writer=artifact_writer
             self.data_ingestion_artifact=data_ingestion_artifact
             self.data_transformation_config=data_transformation_config
             self.data_validation_artifact=data_validation_artifact
@@ -33,9 +40,9 @@ class dataTransformation:
    
    
     @staticmethod
-    def read_csv(file_path) -> pd.DataFrame:
+    def read_data(file_path, file_format: str = None) -> pd.DataFrame:
         try:
-            return pd.read_csv(file_path)
+            return read_dataframe(file_path, file_format=file_format)
         except Exception as e:
             raise MyException(e, sys) from e
 
@@ -43,37 +50,15 @@ class dataTransformation:
        
    
    
-    def handle_date(self,df):
-        """ handling date column because it is object data type"""
-        logging.info("handling date column as month,day,day_of_week")
-        df['Date'] = pd.to_datetime(df['Date'])
-        df['month'] = pd.to_datetime(df['Date']).dt.month
-        df['day'] = pd.to_datetime(df['Date']).dt.day
-        #df['dayofweek']= pd.to_datetime(df['Date']).dt.dayofweek
-        return df
-       
-       
-       
-    def _drop_datecolumn(self, df):
-        """Drop the 'date' column if it exists."""
-        logging.info("Dropping 'date' column")
-        drop_cols = self.schema_config['drop_columns']
-       
-        # Handle both single column (string) and multiple columns (list)
-        if isinstance(drop_cols, list):
-            df = df.drop(columns=[col for col in drop_cols if col in df.columns],axis=1, errors='ignore')
-        else:
-            df = df.drop(columns=[drop_cols], errors='ignore',axis=1)
-       
-        return df
-       
-       
-       
-    def _create_dummy_columns(self, df):
-        """Create dummy variables for categorical features."""
-        logging.info("Creating dummy variables for categorical features")
-        df = pd.get_dummies(data=df).astype(int)
-        return df
+    def get_data_transformer_object(self) -> BikeFeatureTransformer:
+        """
+        Creates the (unfitted) feature transformer from the schema's numerical and categorical columns.
+        The date column yields month and day and is then dropped, as listed in drop_columns.
+        """
+        logging.info("Creating feature transformer from schema")
+        numerical_columns = [column for column in self.schema_config['numerical_columns'] if column != TARGET_COLUMN]
+        return BikeFeatureTransformer(numerical_columns=numerical_columns,
+                                      categorical_columns=self.schema_config['categorical_columns'])
            
            
     def square_root_transformation(self, df):
@@ -108,8 +93,12 @@ class dataTransformation:
 
 
             # Load train and test data
-            train_df = self.read_csv(file_path=self.data_ingestion_artifact.trained_file_path)
-            test_df = self.read_csv(file_path=self.data_ingestion_artifact.test_file_path)
+            file_format = self.data_ingestion_artifact.file_format
+            if self.data_ingestion_artifact.train_df is not None:
+                train_df, test_df = self.data_ingestion_artifact.train_df, self.data_ingestion_artifact.test_df
+            else:
+                train_df = self.read_data(file_path=self.data_ingestion_artifact.trained_file_path, file_format=file_format)
+                test_df = self.read_data(file_path=self.data_ingestion_artifact.test_file_path, file_format=file_format)
             logging.info("Train-Test data loaded")
            
             input_feature_train_df = train_df.drop(columns=[TARGET_COLUMN])
@@ -123,58 +112,53 @@ class dataTransformation:
 
            
            
-            input_feature_train_df = self.handle_date(input_feature_train_df)
-            input_feature_train_df = self._drop_datecolumn(input_feature_train_df)
-            input_feature_train_df = self._create_dummy_columns(input_feature_train_df)
-           # input_feature_train_df = self.square_root_transformation(input_feature_train_df)
-           
-           
-            input_feature_test_df = self.handle_date(input_feature_test_df)
-            input_feature_test_df = self._drop_datecolumn(input_feature_test_df)
-            input_feature_test_df = self._create_dummy_columns(input_feature_test_df)
-           # input_feature_test_df = self.square_root_transformation(input_feature_test_df)
-            logging.info("Custom transformations applied to train and test data")
-
-
-            # # # Get transformer and fit on train data
-            # preprocessor = self.get_data_transformer_object()
-            # input_feature_train_arr = preprocessor.fit_transform(input_feature_train_df)
-            # input_feature_test_arr = preprocessor.transform(input_feature_test_df)
-            # logging.info("Preprocessing pipeline applied")
-
-
-            # Save transformed arrays. The training pipeline expects arrays where the
-            # last column is the target (so downstream trainer can split train[:, :-1], train[:, -1]).
-            # Create numpy arrays with features + target as last column.
-            train_combined = None
-            test_combined = None
-
-            try:
-                train_combined = pd.concat([input_feature_train_df.reset_index(drop=True), target_feature_train_df.reset_index(drop=True)], axis=1).to_numpy()
-                test_combined = pd.concat([input_feature_test_df.reset_index(drop=True), target_feature_test_df.reset_index(drop=True)], axis=1).to_numpy()
-            except Exception:
-                # fallback: if target series not available, save features only
-                train_combined = input_feature_train_df.to_numpy()
-                test_combined = input_feature_test_df.to_numpy()
-
-            save_numpy_array_data(self.data_transformation_config.transformed_train_file_path, train_combined)
-            save_numpy_array_data(self.data_transformation_config.transformed_test_file_path, test_combined)
+            # Get transformer and fit on train data; the same fitted object is bundled with the model
+            preprocessor = self.get_data_transformer_object()
+            feature_dtype = np.dtype(self.data_transformation_config.feature_dtype)
+            input_feature_train_arr = preprocessor.fit_transform(input_feature_train_df, dtype=feature_dtype)
+            input_feature_test_arr = preprocessor.transform(input_feature_test_df, dtype=feature_dtype)
+            target_feature_train_arr = target_feature_train_df.to_numpy(dtype=np.float64)
+            target_feature_test_arr = target_feature_test_df.to_numpy(dtype=np.float64)
+            logging.info("Feature transformer applied to train and test data")
+
+
+            # Save the typed feature matrices and the target vectors as separate .npy files,
+            # so the trainer can memory-map the features without copying out a target column
+            write_artifact(self.artifact_writer, save_numpy_array_data,
+                           self.data_transformation_config.transformed_train_file_path, input_feature_train_arr)
+            write_artifact(self.artifact_writer, save_numpy_array_data,
+                           self.data_transformation_config.transformed_test_file_path, input_feature_test_arr)
+            write_artifact(self.artifact_writer, save_numpy_array_data,
+                           self.data_transformation_config.transformed_train_target_file_path, target_feature_train_arr)
+            write_artifact(self.artifact_writer, save_numpy_array_data,
+                           self.data_transformation_config.transformed_test_target_file_path, target_feature_test_arr)
 
             # Save the transformed feature names (including target as last entry) to a YAML file
-            feature_names = list(input_feature_train_df.columns) + [TARGET_COLUMN]
-            feature_names_path = os.path.join(self.data_transformation_config.data_transformation_dir, 'transformed', 'feature_names.yaml')
-            write_yaml_file(feature_names_path, feature_names, replace=True)
+            feature_names = list(preprocessor.feature_names) + [TARGET_COLUMN]
+            write_artifact(self.artifact_writer, write_yaml_file,
+                           self.data_transformation_config.feature_names_file_path, feature_names, replace=True)
            
-            # #Save preprocessor object
-            # save_object(self.data_transformation_config.transformed_object_file_path, preprocessor)
+            # Save preprocessor object
+            write_artifact(self.artifact_writer, save_object,
+                           self.data_transformation_config.transformed_object_file_path, preprocessor)
             logging.info("Transformed data and preprocessor saved")
 
 
             data_transformation_artifact = DataTransformationArtifact(
                 transformed_train_file_path=self.data_transformation_config.transformed_train_file_path,
                 transformed_test_file_path=self.data_transformation_config.transformed_test_file_path,
-                # transformed_object_file_path=self.data_transformation_config.transformed_object_file_path
+                transformed_train_target_file_path=self.data_transformation_config.transformed_train_target_file_path,
+                transformed_test_target_file_path=self.data_transformation_config.transformed_test_target_file_path,
+                feature_names_file_path=self.data_transformation_config.feature_names_file_path,
+                transformed_object_file_path=self.data_transformation_config.transformed_object_file_path
             )
+            if self.artifact_writer is not None:
+                data_transformation_artifact.train_arr = input_feature_train_arr
+                data_transformation_artifact.test_arr = input_feature_test_arr
+                data_transformation_artifact.train_target = target_feature_train_arr
+                data_transformation_artifact.test_target = target_feature_test_arr
+                data_transformation_artifact.feature_names = feature_names
+                data_transformation_artifact.preprocessing_object = preprocessor
            
             logging.info(f"Data Transformation Artifact: {data_transformation_artifact}")
             return data_transformation_artifact
@@ -11,10 +11,12 @@ from pandas import DataFrame
 
 from src.exception import MyException
 from src.logger import logging
-from src.utils.main_utils import read_yaml_file
+from src.utils.main_utils import read_yaml_file, read_dataframe, read_dataframe_schema, iter_dataframe_batches
+from src.entity.validation_plan import ValidationPlan
+from src.entity.drift_profile import DriftProfile
 from src.entity.artifact_entity import DataIngestionArtifact, DataValidationArtifact
 from src.entity.config_entity import DataValidationConfig
-from src.constants import SCHEMA_FILE_PATH
+from src.constants import SCHEMA_FILE_PATH, TARGET_COLUMN
 
 
 
@@ -29,6 +31,8 @@ class DataValidation:
             self.data_ingestion_artifact = data_ingestion_artifact
             self.data_validation_config = data_validation_config
             self._schema_config =read_yaml_file(file_path=SCHEMA_FILE_PATH)
+            self._validation_plan = ValidationPlan.from_schema(self._schema_config,
+                                                               default_max_null_ratio=data_validation_config.max_null_ratio)
         except Exception as e:
             raise MyException(e,sys)
        
@@ -59,32 +63,21 @@ class DataValidation:
         On Failure  :   Write an exception log and then raise an exception
         """
         try:
-            dataframe_columns = df.columns
-            missing_numerical_columns = []
-            missing_categorical_columns = []
-            missing_object_columns=[]
-            for column in self._schema_config["numerical_columns"]:
-                if column not in dataframe_columns:
-                    missing_numerical_columns.append(column)
+            dataframe_columns = set(df.columns)
+            missing_numerical_columns = [column for column in self._schema_config["numerical_columns"]
+                                         if column not in dataframe_columns]
+            missing_categorical_columns = [column for column in self._schema_config["categorical_columns"]
+                                           if column not in dataframe_columns]
+            missing_object_columns = [column for column in self._schema_config["object_columns"]
+                                      if column not in dataframe_columns]
 
 
             if len(missing_numerical_columns)>0:
                 logging.info(f"Missing numerical column: {missing_numerical_columns}")
 
 
-
-
-            for column in self._schema_config["categorical_columns"]:
-                if column not in dataframe_columns:
-                    missing_categorical_columns.append(column)
-
-
             if len(missing_categorical_columns)>0:
                 logging.info(f"Missing categorical column: {missing_categorical_columns}")
-               
-            for column in self._schema_config["object_columns"]:
-                if column not in dataframe_columns:
-                    missing_object_columns.append(column)
 
 
             if len(missing_object_columns)>0:
@@ -98,10 +91,75 @@ class DataValidation:
        
        
        
+    def validate_column_values(self, file_path: str, dataframe: DataFrame = None) -> dict:
+        """
+        Method Name :   validate_column_values
+        Description :   This method runs the schema's dtype, null ratio, range and category checks.
+                        An in-memory DataFrame is checked directly, otherwise the file is streamed
+                        in batches so it never has to fit in memory
+
+        Output      :   Returns the ValidationPlan report with status, failures and per-column stats
+        On Failure  :   Write an exception log and then raise an exception
+        """
+        try:
+            if dataframe is not None:
+                stats = self._validation_plan.evaluate(dataframe)
+            else:
+                stats = self._validation_plan.evaluate_batches(
+                    iter_dataframe_batches(file_path, file_format=self.data_ingestion_artifact.file_format,
+                                           batch_size=self.data_validation_config.batch_size))
+            report = self._validation_plan.report(stats)
+            for column, failures in report["failures"].items():
+                logging.info(f"Column [{column}] failed validation: {failures}")
+            return report
+        except Exception as e:
+            raise MyException(e, sys) from e
+
+
+    def detect_drift(self) -> dict:
+        """
+        Method Name :   detect_drift
+        Description :   This method profiles the training split (binned histograms and category counts),
+                        saves the profile and compares it by PSI/KS with the profile of the last
+                        accepted training snapshot, if there is one
+
+        Output      :   Returns the drift report, with drift_detected False when there is no reference
+        On Failure  :   Write an exception log and then raise an exception
+        """
+        try:
+            numerical_columns = [column for column in self._schema_config["numerical_columns"] if column != TARGET_COLUMN]
+            categorical_columns = list(self._schema_config["categorical_columns"])
+            if self.data_ingestion_artifact.train_df is not None:
+                batches_fn = lambda: [self.data_ingestion_artifact.train_df]
+            else:
+                batches_fn = lambda: iter_dataframe_batches(self.data_ingestion_artifact.trained_file_path,
+                                                            file_format=self.data_ingestion_artifact.file_format,
+                                                            batch_size=self.data_validation_config.batch_size,
+                                                            columns=numerical_columns + categorical_columns)
+
+            reference = DriftProfile.load(self.data_validation_config.drift_reference_file_path)
+            profile, current = DriftProfile.build(batches_fn, numerical_columns, categorical_columns,
+                                                  n_bins=self.data_validation_config.drift_bins,
+                                                  sample_size=self.data_validation_config.drift_sample_size,
+                                                  reference=reference)
+            profile.save(self.data_validation_config.drift_profile_file_path)
+
+            if reference is None:
+                logging.info("No drift reference profile yet, skipping drift comparison")
+                return {"drift_detected": False, "drifted_features": [], "reference_rows": None, "features": {}}
+            drift_report = reference.compare(current, psi_threshold=self.data_validation_config.drift_psi_threshold,
+                                             ks_threshold=self.data_validation_config.drift_ks_threshold)
+            if drift_report["drift_detected"]:
+                logging.info(f"Drift detected in features: {drift_report['drifted_features']}")
+            return drift_report
+        except Exception as e:
+            raise MyException(e, sys) from e
+
+
     @staticmethod
-    def read_data(file_path) -> DataFrame:
+    def read_data(file_path, file_format: str = None, columns: list = None) -> DataFrame:
         try:
-            return pd.read_csv(file_path)
+            return read_dataframe(file_path, file_format=file_format, columns=columns)
         except Exception as e:
             raise MyException(e, sys)
        
@@ -120,8 +178,13 @@ class DataValidation:
         try:
             validation_error_msg = ""
             logging.info("Starting data validation")
-            train_df, test_df = (DataValidation.read_data(file_path=self.data_ingestion_artifact.trained_file_path),
-                                 DataValidation.read_data(file_path=self.data_ingestion_artifact.test_file_path))
+            # Column checks only need the file schema, so no rows are read here
+            file_format = self.data_ingestion_artifact.file_format
+            if self.data_ingestion_artifact.train_df is not None:
+                train_df, test_df = self.data_ingestion_artifact.train_df, self.data_ingestion_artifact.test_df
+            else:
+                train_df, test_df = (read_dataframe_schema(self.data_ingestion_artifact.trained_file_path, file_format),
+                                     read_dataframe_schema(self.data_ingestion_artifact.test_file_path, file_format))
 
 
             # Checking col len of dataframe for train/test df
@@ -154,13 +217,33 @@ class DataValidation:
                 logging.info(f"All categorical/int columns present in testing dataframe: {status}")
 
 
+            # Value checks, only once every expected column is present
+            column_reports = {}
+            if len(validation_error_msg) == 0:
+                for split, file_path, dataframe in (
+                        ("train", self.data_ingestion_artifact.trained_file_path, self.data_ingestion_artifact.train_df),
+                        ("test", self.data_ingestion_artifact.test_file_path, self.data_ingestion_artifact.test_df)):
+                    column_reports[split] = self.validate_column_values(file_path, dataframe)
+                    if not column_reports[split]["status"]:
+                        validation_error_msg += (f"Column values failed validation in {split} dataframe: "
+                                                 f"{sorted(column_reports[split]['failures'])}. ")
+
+
+            drift_report = None
+            if len(validation_error_msg) == 0:
+                drift_report = self.detect_drift()
+                if drift_report["drift_detected"] and self.data_validation_config.drift_gate:
+                    validation_error_msg += f"Data drift detected in {drift_report['drifted_features']}. "
+
+
             validation_status = len(validation_error_msg) == 0
 
 
             data_validation_artifact = DataValidationArtifact(
                 validation_status=validation_status,
                 message=validation_error_msg,
-                validation_report_file_path=self.data_validation_config.data_validation_file_path
+                validation_report_file_path=self.data_validation_config.data_validation_file_path,
+                drift_profile_file_path=self.data_validation_config.drift_profile_file_path if drift_report else None
             )
 
 
@@ -172,7 +255,9 @@ class DataValidation:
             # Save validation status and message to a JSON file
             validation_report = {
                 "validation_status": validation_status,
-                "message": validation_error_msg.strip()
+                "message": validation_error_msg.strip(),
+                "column_checks": column_reports,
+                "drift": drift_report
             }
 
 
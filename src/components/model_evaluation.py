@@ -4,11 +4,16 @@ from sklearn.metrics import r2_score
 from src.exception import MyException
 from src.constants import TARGET_COLUMN,SCHEMA_FILE_PATH
 from src.logger import logging
-from src.utils.main_utils import load_object, read_yaml_file
+from src.utils.main_utils import load_object, read_yaml_file, read_dataframe
+import multiprocessing
+import os
 import sys
+import numpy as np
 import pandas as pd
-from typing import Optional
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional
 from src.entity.s3_estimator import Proj1Estimator
+from src.utils.date_features import DateFeatureExtractor
 from dataclasses import dataclass
 
 
@@ -18,6 +23,28 @@ class EvaluateModelResponse:
     best_model_R2_score: float
     is_model_accepted: bool
     difference: float
+    # Per-fold R2 of both models on the same time-ordered folds of the test split
+    trained_model_fold_scores: Optional[List[float]] = None
+    best_model_fold_scores: Optional[List[float]] = None
+
+
+# Models of a fold-scoring worker process, loaded once by _init_fold_worker
+_fold_worker_state: dict = {}
+
+
+def _init_fold_worker(model_file_paths: Dict[str, str]) -> None:
+    _fold_worker_state["models"] = {name: load_object(file_path) for name, file_path in model_file_paths.items()}
+
+
+def _fold_r2_scores(models: Dict[str, object], fold_inputs: Dict[str, pd.DataFrame], fold_target: pd.Series) -> Dict[str, float]:
+    """
+    R2 of every model on one fold, each model predicting from its own input frame.
+    """
+    return {name: float(r2_score(fold_target, model.predict(fold_inputs[name]))) for name, model in models.items()}
+
+
+def _score_fold(fold_inputs: Dict[str, pd.DataFrame], fold_target: pd.Series) -> Dict[str, float]:
+    return _fold_r2_scores(_fold_worker_state["models"], fold_inputs, fold_target)
 
 
 
@@ -32,6 +59,7 @@ class ModelEvaluation:
             self.data_ingestion_artifact = data_ingestion_artifact
             self.model_trainer_artifact = model_trainer_artifact
             self.schema_config=read_yaml_file(file_path=SCHEMA_FILE_PATH)
+            self.date_extractor = DateFeatureExtractor()
         except Exception as e:
             raise MyException(e, sys) from e
 
@@ -59,13 +87,15 @@ class ModelEvaluation:
        
 
 
+    # handle_date, _drop_datecolumn and _create_dummy_columns rebuild the features of production models
+    # pickled before the fitted feature transformer was bundled with the model
+
     def handle_date(self,df):
         """ handling date column because it is object data type"""
         logging.info("handling date column as month,day,day_of_week")
-        df['Date'] = pd.to_datetime(df['Date'])
-        df['month'] = pd.to_datetime(df['Date']).dt.month
-        df['day'] = pd.to_datetime(df['Date']).dt.day
-        #df['dayofweek']= pd.to_datetime(df['Date']).dt.dayofweek
+        date_features = self.date_extractor.transform(df['Date'], features=("month", "day"))
+        df['month'] = date_features["month"]
+        df['day'] = date_features["day"]
         return df
        
        
@@ -93,6 +123,62 @@ class ModelEvaluation:
            
 
 
+    def get_time_folds(self, dates: pd.Series) -> List[np.ndarray]:
+        """
+        Method Name :   get_time_folds
+        Description :   Cuts the test split's dates into n_folds consecutive periods of whole days, so
+                        every fold is a later period than the training data and no day is shared
+                        between two folds. Rows whose date does not parse belong to no period and are
+                        left out of every fold
+
+        Output      :   Returns the row positions of each fold, oldest period first
+        """
+        parsed = self.date_extractor.parse(dates).to_numpy()
+        is_dated = ~np.isnat(parsed)
+        if not is_dated.all():
+            logging.warning(f"Leaving {int((~is_dated).sum())} rows with an unparseable date out of the time folds")
+        unique_dates = np.unique(parsed[is_dated])
+        n_folds = max(1, min(self.model_eval_config.n_folds, len(unique_dates)))
+        # Each fold starts at the first date of its block of days
+        fold_start_dates = [block[0] for block in np.array_split(unique_dates, n_folds)]
+        fold_ids = np.searchsorted(fold_start_dates, parsed, side="right") - 1
+        # NaT sorts after every date, so undated rows would otherwise land in the last fold
+        fold_ids[~is_dated] = -1
+        return [np.flatnonzero(fold_ids == fold_id) for fold_id in range(n_folds)]
+
+
+    def get_n_fold_workers(self, n_folds: int) -> int:
+        """
+        Number of processes scoring folds: n_jobs (every core if below 1), never more than the
+        cores or the folds
+        """
+        n_cpus = os.cpu_count() or 1
+        n_jobs = self.model_eval_config.n_jobs
+        return max(1, min(n_folds, n_cpus if n_jobs is None or n_jobs < 1 else min(n_jobs, n_cpus)))
+
+
+    def score_folds(self, models: Dict[str, object], model_file_paths: Dict[str, str], inputs: Dict[str, pd.DataFrame],
+                    target: pd.Series, folds: List[np.ndarray]) -> Dict[str, List[float]]:
+        """
+        Method Name :   score_folds
+        Description :   Scores every model on every fold. With one worker the folds are scored here with the
+                        already loaded models; otherwise they run in a spawned process pool whose workers
+                        load the models once from their files and receive only their fold's rows
+
+        Output      :   Returns {model name: [R2 per fold]}
+        """
+        fold_args = (({name: frame.iloc[rows] for name, frame in inputs.items()}, target.iloc[rows]) for rows in folds)
+        n_workers = self.get_n_fold_workers(len(folds))
+        if n_workers <= 1:
+            fold_scores = [_fold_r2_scores(models, fold_inputs, fold_target) for fold_inputs, fold_target in fold_args]
+        else:
+            logging.info(f"Scoring {len(folds)} folds in {n_workers} worker processes")
+            with ProcessPoolExecutor(max_workers=n_workers, mp_context=multiprocessing.get_context("spawn"),
+                                     initializer=_init_fold_worker, initargs=(model_file_paths,)) as executor:
+                fold_scores = list(executor.map(_score_fold, *zip(*fold_args)))
+        return {name: [scores[name] for scores in fold_scores] for name in model_file_paths}
+
+
     def evaluate_model(self) -> EvaluateModelResponse:
         """
         Method Name :   evaluate_model
@@ -103,38 +189,70 @@ class ModelEvaluation:
         On Failure  :   Write an exception log and then raise an exception
         """
         try:
-            test_df = pd.read_csv(self.data_ingestion_artifact.test_file_path)
+            test_df = self.data_ingestion_artifact.test_df
+            if test_df is None:
+                test_df = read_dataframe(self.data_ingestion_artifact.test_file_path,
+                                         file_format=self.data_ingestion_artifact.file_format)
             x, y = test_df.drop(TARGET_COLUMN, axis=1), test_df[TARGET_COLUMN]
 
 
-            logging.info("Test data loaded and now transforming it for prediction...")
-
-
-            x = self.handle_date(x)
-            x = self._drop_datecolumn(x)
-            x = self._create_dummy_columns(x)
-            #x = self._rename_columns(x)
+            logging.info("Test data loaded.")
 
 
-            trained_model = load_object(file_path=self.model_trainer_artifact.trained_model_file_path)
-            logging.info("Trained model loaded/exists.")
             trained_model_R2_score = self.model_trainer_artifact.metric_artifact.R2_score
             logging.info(f"R2_Score for this model: {trained_model_R2_score}")
 
 
             best_model_R2_score=None
+            trained_model_fold_scores, best_model_fold_scores = None, None
+            is_model_accepted = trained_model_R2_score > 0
             best_model = self.get_best_model()
             if best_model is not None:
                 logging.info(f"Computing R2_Score for production model..")
-                y_hat_best_model = best_model.predict(x)
-                best_model_R2_score = r2_score(y, y_hat_best_model)
-                logging.info(f"R2_Score-Production Model: {best_model_R2_score}, R2_Score-New Trained Model: {trained_model_R2_score}")
+                # Pool workers load the production model from the local model cache file
+                production_model_file = best_model.get_model_file()
+                production_model = load_object(production_model_file)
+                uses_legacy_features = getattr(production_model, "preprocessing_object", None) is None
+                production_x = x
+                if uses_legacy_features:
+                    logging.info("Production model has no feature transformer, building legacy features...")
+                    production_x = self._create_dummy_columns(self._drop_datecolumn(self.handle_date(x.copy())))
+
+                folds = self.get_time_folds(x['Date'])
+                models = None
+                if self.get_n_fold_workers(len(folds)) <= 1:
+                    # Scored in this process, so reuse the loaded models instead of reading them again
+                    trained_model = self.model_trainer_artifact.trained_model
+                    if trained_model is None:
+                        trained_model = load_object(file_path=self.model_trainer_artifact.trained_model_file_path)
+                    models = {"trained": trained_model, "production": production_model}
+                # Pool workers load their own copies, so the parent does not hold one meanwhile
+                del production_model
+                fold_scores = self.score_folds(
+                    models=models,
+                    model_file_paths={"trained": self.model_trainer_artifact.trained_model_file_path,
+                                      "production": production_model_file},
+                    inputs={"trained": x, "production": production_x}, target=y, folds=folds)
+                trained_model_fold_scores, best_model_fold_scores = fold_scores["trained"], fold_scores["production"]
+                trained_model_R2_score = float(np.mean(trained_model_fold_scores))
+                best_model_R2_score = float(np.mean(best_model_fold_scores))
+
+                # Both models are scored on identical folds, so compare them fold by fold: the new model
+                # is accepted if its mean gain is positive and larger than the gain's standard error
+                differences = np.subtract(trained_model_fold_scores, best_model_fold_scores)
+                standard_error = differences.std(ddof=1) / np.sqrt(len(differences)) if len(differences) > 1 else 0.0
+                is_model_accepted = bool(differences.mean() > 0 and differences.mean() > standard_error)
+                logging.info(f"R2_Score-Production Model: {best_model_R2_score}, R2_Score-New Trained Model: "
+                             f"{trained_model_R2_score} over {len(folds)} time folds, "
+                             f"gain standard error {standard_error:.6f}")
 
             tmp_best_model_score = 0 if best_model_R2_score is None else best_model_R2_score
             result = EvaluateModelResponse(trained_model_R2_score=trained_model_R2_score,
                                            best_model_R2_score=best_model_R2_score,
-                                           is_model_accepted=trained_model_R2_score > tmp_best_model_score,
-                                           difference=trained_model_R2_score - tmp_best_model_score
+                                           is_model_accepted=is_model_accepted,
+                                           difference=trained_model_R2_score - tmp_best_model_score,
+                                           trained_model_fold_scores=trained_model_fold_scores,
+                                           best_model_fold_scores=best_model_fold_scores
                                            )
             logging.info(f"Result: {result}")
             return result
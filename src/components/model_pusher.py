@@ -37,6 +37,8 @@ class ModelPusher:
             
             logging.info("Uploading new model to S3 bucket....")
             self.proj1_estimator.save_model(from_file=self.model_evaluation_artifact.trained_model_path)
+            # The pusher runs in the training job process, not a serving worker: each worker picks up
+            # the new version when its model cache TTL expires and the ETag check sees the new object
             model_pusher_artifact = ModelPusherArtifact(bucket_name=self.model_pusher_config.bucket_name,
                                                         s3_model_path=self.model_pusher_config.s3_model_key_path)
 
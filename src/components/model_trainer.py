@@ -1,3 +1,4 @@
+import os
 import sys
 from typing import Tuple
 
@@ -9,10 +10,14 @@ import xgboost as xgb
 from sklearn.metrics import mean_squared_error, r2_score
 from src.exception import MyException
 from src.logger import logging
-from src.utils.main_utils import load_numpy_array_data, load_object, save_object
+from src.utils.main_utils import load_numpy_array_data, load_object, save_object, read_yaml_file, write_yaml_file
+from src.utils.metrics import regression_metrics
+from src.constants import TARGET_COLUMN
 from src.entity.config_entity import ModelTrainerConfig
 from src.entity.artifact_entity import DataTransformationArtifact, ModelTrainerArtifact, RegressorMetricArtifact
 from src.entity.estimator import MyModel
+from src.entity.model_search import ModelSearch
+from src.entity.booster_model import ArrayChunkIter, BoosterRegressor
 
 
 class ModelTrainer:
@@ -24,63 +29,139 @@ class ModelTrainer:
         """
         self.data_transformation_artifact = data_transformation_artifact
         self.model_trainer_config = model_trainer_config
+        self.search_trials = []
 
 
-    def get_model_object_and_report(self, train: np.array, test: np.array) -> Tuple[object, object]:
+    def _xgboost_params(self) -> dict:
         """
-        Method Name :   get_model_object_and_report
-        Description :   This function trains a RandomForestClassifier with specified parameters
-       
-        Output      :   Returns metric artifact object and trained model object
+        XGBoost parameters from the trainer config, shared by the in-memory and out-of-core paths.
+        """
+        config = self.model_trainer_config
+        return dict(
+            objective=config.objective,
+            gamma=config.gamma,
+            learning_rate=config.learning_rate,
+            max_depth=config._max_depth,
+            min_child_weight=config.MODEL_TRAINER_MIN_CHILD_WEIGHT,
+            subsample=config.subsample,
+            colsample_bytree=config.colsample_bytree,
+            reg_alpha=config.reg_alpha,
+            reg_lambda=config.reg_lambda,
+            tree_method=config.tree_method,
+            max_bin=config.max_bin,
+            eval_metric="rmse",
+        )
+
+
+    def get_xgboost_model(self, x_train: np.ndarray, y_train: np.ndarray) -> Tuple[xgb.XGBRegressor, float]:
+        """
+        Method Name :   get_xgboost_model
+        Description :   This function trains XGBRegressor with histogram tree building on all configured cores,
+                        early stopped on the latest validation_split share of the (time-ordered) training
+                        rows, so it stops on forecasting later hours rather than interpolating between
+                        neighbouring ones
+
+        Output      :   Returns the fitted XGBRegressor, predicting with its best iteration only, and its
+                        R2 on the validation fold
         On Failure  :   Write an exception log and then raise an exception
         """
         try:
-            logging.info("Training Xgboost with specified parameters")
-
-
-            # Splitting the train and test data into features and target variables
-            x_train, y_train, x_test, y_test = train[:, :-1], train[:, -1], test[:, :-1], test[:, -1]
-            logging.info("train-test split done.")
-
-
-            # Initialize RandomForestClassifier with specified parameters
-            model = RandomForestRegressor(random_state=42
-                # objective = self.model_trainer_config.objective,
-                # n_estimators = self.model_trainer_config._n_estimators,
-                # gamma = self.model_trainer_config.gamma,
-                # learning_rate = self.model_trainer_config.learning_rate,
-                # max_depth = self.model_trainer_config._max_depth,  
-                # subsample = self.model_trainer_config.subsample,
-                # colsample_bytree = self.model_trainer_config.colsample_bytree,    
-                # reg_alpha = self.model_trainer_config.reg_alpha,
-                # reg_lambda = self.model_trainer_config.reg_lambda,
-                # n_jobs = self.model_trainer_config.n_jobs,
-                # random_state = self.model_trainer_config.random_state
+            config = self.model_trainer_config
+            n_fit = len(x_train) - max(1, int(len(x_train) * config.validation_split))
+
+            model = xgb.XGBRegressor(
+                n_estimators=config._n_estimators,
+                early_stopping_rounds=config.early_stopping_rounds,
+                n_jobs=config.n_jobs,
+                random_state=config.random_state,
+                **self._xgboost_params(),
             )
-            #     min_samples_split = self.model_trainer_config._min_samples_split,
-            #     min_samples_leaf = self.model_trainer_config._min_samples_leaf,
-            #     max_depth = self.model_trainer_config._max_depth,
-            #     criterion = self.model_trainer_config._criterion,
-            #     random_state = self.model_trainer_config._random_state
-            # )
+            x_valid, y_valid = x_train[n_fit:], y_train[n_fit:]
+            model.fit(x_train[:n_fit], y_train[:n_fit], eval_set=[(x_valid, y_valid)], verbose=False)
+            logging.info(f"XGBoost early stopped at {model.best_iteration + 1} of {config._n_estimators} trees, "
+                         f"validation rmse {model.best_score:.4f}")
+            return model, r2_score(y_valid, model.predict(x_valid))
+        except Exception as e:
+            raise MyException(e, sys) from e
 
 
-            # Fit the model
-            logging.info("Model training going on...")
-            model.fit(x_train, y_train)
-            logging.info("Model training done.")
+    def get_out_of_core_model_and_report(self, x_train: np.ndarray, y_train: np.ndarray,
+                                         x_test: np.ndarray, y_test: np.ndarray) -> Tuple[object, object]:
+        """
+        Method Name :   get_out_of_core_model_and_report
+        Description :   This function trains XGBoost from an external-memory DMatrix fed chunk by chunk,
+                        so only one chunk of the (memory-mapped) arrays is resident at a time
 
+        Output      :   Returns metric artifact object and trained BoosterRegressor
+        On Failure  :   Write an exception log and then raise an exception
+        """
+        try:
+            config = self.model_trainer_config
+            if config.backend != "xgboost":
+                raise ValueError(f"Out-of-core training needs the xgboost backend, not {config.backend!r}")
+            os.makedirs(config.external_memory_cache_dir, exist_ok=True)
+            split = dict(chunk_rows=config.chunk_rows, validation_split=config.validation_split)
+            dtrain = xgb.DMatrix(ArrayChunkIter(x_train, y_train, subset="fit", **split,
+                                                cache_prefix=os.path.join(config.external_memory_cache_dir, "train")))
+            dvalid = xgb.DMatrix(ArrayChunkIter(x_train, y_train, subset="validation", **split,
+                                                cache_prefix=os.path.join(config.external_memory_cache_dir, "validation")))
+            logging.info(f"Built external-memory DMatrix with {dtrain.num_row()} fit and {dvalid.num_row()} validation rows")
+
+            params = self._xgboost_params()
+            params["seed"] = config.random_state
+            if config.n_jobs is not None and config.n_jobs > 0:
+                params["nthread"] = config.n_jobs
+            booster = xgb.train(params, dtrain, num_boost_round=config._n_estimators, evals=[(dvalid, "validation")],
+                                early_stopping_rounds=config.early_stopping_rounds, verbose_eval=False)
+            model = BoosterRegressor(booster, best_iteration=booster.best_iteration)
+            logging.info(f"XGBoost early stopped at {booster.best_iteration + 1} of {config._n_estimators} trees")
+
+            valid_pred = booster.predict(dvalid, iteration_range=(0, booster.best_iteration + 1))
+            metric_artifact = regression_metrics(model, x_test, y_test, chunk_rows=config.chunk_rows,
+                                                 validation_R2_score=r2_score(dvalid.get_label(), valid_pred),
+                                                 validation_source="validation_fold")
+            return model, metric_artifact
+        except Exception as e:
+            raise MyException(e, sys) from e
 
-            # Predictions and evaluation metrics
-            y_pred = model.predict(x_test)
-            R2_score = r2_score(y_test, y_pred)
-            # f1 = f1_score(y_test, y_pred)
-            # precision = precision_score(y_test, y_pred)
-            # recall = recall_score(y_test, y_pred)
+
+    def get_model_object_and_report(self, x_train: np.ndarray, y_train: np.ndarray,
+                                    x_test: np.ndarray, y_test: np.ndarray) -> Tuple[object, object]:
+        """
+        Method Name :   get_model_object_and_report
+        Description :   This function trains the configured backend (the model.yaml search or XGBoost)
+                        and scores it on the test split
+       
+        Output      :   Returns metric artifact object and trained model object
+        On Failure  :   Write an exception log and then raise an exception
+        """
+        try:
+            logging.info("Model training going on...")
+            validation_R2_score, validation_source = None, None
+            if self.model_trainer_config.backend == "xgboost":
+                logging.info("Training XGBoost with the configured parameters")
+                model, validation_R2_score = self.get_xgboost_model(x_train, y_train)
+                validation_source = "validation_fold"
+            elif self.model_trainer_config.backend == "sklearn":
+                model_search = ModelSearch.from_yaml(self.model_trainer_config.model_config_file_path)
+                logging.info(f"Training {model_search.model_config['class']} with search method {model_search.method}")
+                # Search candidates on the training split only; the test split stays unseen until scoring
+                model, self.search_trials = model_search.fit(x_train, y_train)
+                if getattr(model, "oob_score_", None) is not None:
+                    # Set when model.yaml enables oob_score; a RandomForestRegressor's OOB score is R2
+                    validation_R2_score, validation_source = model.oob_score_, "oob"
+                elif model_search.best_score is not None and model_search.search_config.get("scoring", "r2") == "r2":
+                    validation_R2_score, validation_source = model_search.best_score, "cv"
+            else:
+                raise ValueError(f"Unknown model trainer backend {self.model_trainer_config.backend!r}")
+            logging.info("Model training done.")
 
 
-            # Creating metric artifact
-            metric_artifact = RegressorMetricArtifact(R2_score=R2_score)
+            # Predictions and evaluation metrics, computed once and reused for the acceptance check
+            metric_artifact = regression_metrics(model, x_test, y_test, chunk_rows=self.model_trainer_config.chunk_rows,
+                                                 validation_R2_score=validation_R2_score,
+                                                 validation_source=validation_source)
+            logging.info(f"Model metrics: {metric_artifact}")
             return model, metric_artifact
        
         except Exception as e:
@@ -100,38 +181,69 @@ class ModelTrainer:
             print("------------------------------------------------------------------------------------------------")
             print("Starting Model Trainer Component")
             # Load transformed train and test data
-            train_arr = load_numpy_array_data(file_path=self.data_transformation_artifact.transformed_train_file_path)
-            test_arr = load_numpy_array_data(file_path=self.data_transformation_artifact.transformed_test_file_path)
+            artifact = self.data_transformation_artifact
+            if artifact.train_arr is not None:
+                x_train, y_train = artifact.train_arr, artifact.train_target
+                x_test, y_test = artifact.test_arr, artifact.test_target
+            else:
+                # Map the files read-only instead of reading them: pages are loaded on demand and
+                # shared with any other process mapping the same artifacts
+                x_train = load_numpy_array_data(file_path=artifact.transformed_train_file_path, mmap_mode="r")
+                y_train = load_numpy_array_data(file_path=artifact.transformed_train_target_file_path, mmap_mode="r")
+                x_test = load_numpy_array_data(file_path=artifact.transformed_test_file_path, mmap_mode="r")
+                y_test = load_numpy_array_data(file_path=artifact.transformed_test_target_file_path, mmap_mode="r")
             logging.info("train-test data loaded")
            
             # Train model and get metrics
-            trained_model, metric_artifact = self.get_model_object_and_report(train=train_arr, test=test_arr)
+            if self.model_trainer_config.out_of_core:
+                trained_model, metric_artifact = self.get_out_of_core_model_and_report(x_train, y_train, x_test, y_test)
+            else:
+                trained_model, metric_artifact = self.get_model_object_and_report(x_train, y_train, x_test, y_test)
             logging.info("Model object and artifact loaded.")
            
             # Load preprocessing object
-            # preprocessing_obj = load_object(file_path=self.data_transformation_artifact.transformed_object_file_path)
-            # logging.info("Preprocessing obj loaded.")
+            preprocessing_obj = self.data_transformation_artifact.preprocessing_object
+            if preprocessing_obj is None:
+                preprocessing_obj = load_object(file_path=self.data_transformation_artifact.transformed_object_file_path)
+            logging.info("Preprocessing obj loaded.")
 
 
-            # Check if the model's accuracy meets the expected threshold
-            if r2_score(train_arr[:, -1], trained_model.predict(train_arr[:, :-1])) < self.model_trainer_config.expected_accuracy:
+            # Check if the model's accuracy meets the expected threshold, on held-out rows rather than
+            # by predicting the whole training set again
+            if metric_artifact.R2_score < self.model_trainer_config.expected_accuracy:
                 logging.info("No model found with score above the base score")
                 raise Exception("No model found with score above the base score")
 
 
             # Save the final model object that includes both preprocessing and the trained model
             logging.info("Saving new model as performace is better than previous one.")
-            my_model = MyModel( trained_model_object=trained_model)
-           # my_model = MyModel(preprocessing_object=preprocessing_obj, trained_model_object=trained_model)
+            # Bundle the trained feature order with the model so serving does not need the artifact tree
+            feature_names = self.data_transformation_artifact.feature_names
+            if feature_names is None:
+                feature_names = read_yaml_file(self.data_transformation_artifact.feature_names_file_path)
+            if feature_names and feature_names[-1] == TARGET_COLUMN:
+                feature_names = feature_names[:-1]
+            my_model = MyModel(trained_model_object=trained_model, feature_names=feature_names,
+                               preprocessing_object=preprocessing_obj)
             save_object(self.model_trainer_config.trained_model_file_path, my_model)
             logging.info("Saved final model object that includes both preprocessing and the trained model")
 
 
+            search_trials_file_path = None
+            if self.search_trials:
+                search_trials_file_path = self.model_trainer_config.search_trials_file_path
+                write_yaml_file(search_trials_file_path, self.search_trials, replace=True)
+                logging.info(f"Saved {len(self.search_trials)} search trials")
+
             # Create and return the ModelTrainerArtifact
             model_trainer_artifact = ModelTrainerArtifact(
                 trained_model_file_path=self.model_trainer_config.trained_model_file_path,
                 metric_artifact=metric_artifact,
+                search_trials_file_path=search_trials_file_path,
             )
+            # The model file is always written synchronously above; only the handoff is in memory
+            if self.data_transformation_artifact.train_arr is not None:
+                model_trainer_artifact.trained_model = my_model
             logging.info(f"Model trainer artifact: {model_trainer_artifact}")
             return model_trainer_artifact
        
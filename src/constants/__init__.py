@@ -32,14 +32,16 @@ MODEL_FILE_NAME = "model.pkl"
 
 TARGET_COLUMN = "Rented Bike Count"
 CURRENT_YEAR = date.today().year
-# PREPROCESSING_OBJECT_FILE_NAME = "preprocessing.pkl"
+PREPROCESSING_OBJECT_FILE_NAME = "preprocessing.pkl"
 
 
 
 
+# Format of the train/test data handed between pipeline stages: "parquet" or "csv"
+ARTIFACT_FILE_FORMAT: str = "parquet"
 FILE_NAME: str = "data.csv"
-TRAIN_FILE_NAME: str = "train.csv"
-TEST_FILE_NAME: str = "test.csv"
+TRAIN_FILE_NAME: str = f"train.{ARTIFACT_FILE_FORMAT}"
+TEST_FILE_NAME: str = f"test.{ARTIFACT_FILE_FORMAT}"
 SCHEMA_FILE_PATH = os.path.join("config", "schema.yaml")
 
 
@@ -56,6 +58,16 @@ DATA_INGESTION_DIR_NAME: str = "data_ingestion"
 DATA_INGESTION_FEATURE_STORE_DIR: str = "feature_store"
 DATA_INGESTION_INGESTED_DIR: str = "ingested"
 DATA_INGESTION_TRAIN_TEST_SPLIT_RATIO: float = 0.20
+DATA_INGESTION_STREAMING: bool = False
+DATA_INGESTION_BATCH_SIZE: int = 100_000
+DATA_INGESTION_INCREMENTAL: bool = False
+DATA_INGESTION_DATASET_DIR: str = os.path.join(ARTIFACT_DIR, DATA_INGESTION_FEATURE_STORE_DIR, DEFAULT_TABLE)
+DATA_INGESTION_WATERMARK_FILE_NAME: str = "watermark.yaml"
+DATA_INGESTION_DATE_COLUMN: str = "Date"
+DATA_INGESTION_HOUR_COLUMN: str = "Hour"
+DATA_INGESTION_DATE_FORMAT: str = "%d/%m/%Y"
+DATA_INGESTION_SQL_DATE_FORMAT: str = "dd/MM/yyyy"
+DATA_INGESTION_KEY_COLUMNS: list = [DATA_INGESTION_DATE_COLUMN, DATA_INGESTION_HOUR_COLUMN]
 
 
 
@@ -67,6 +79,17 @@ Data Validation realted contant start with DATA_VALIDATION VAR NAME
 """
 DATA_VALIDATION_DIR_NAME: str = "data_validation"
 DATA_VALIDATION_REPORT_FILE_NAME: str = "report.yaml"
+DATA_VALIDATION_MAX_NULL_RATIO: float = 0.0
+DATA_VALIDATION_BATCH_SIZE: int = 100_000
+DATA_VALIDATION_DRIFT_PROFILE_FILE_NAME: str = "drift_profile.yaml"
+# Profile of the training data behind the last accepted model, new data is compared against it
+DATA_VALIDATION_DRIFT_REFERENCE_FILE_PATH: str = os.path.join(ARTIFACT_DIR, "drift_reference", DATA_VALIDATION_DRIFT_PROFILE_FILE_NAME)
+DATA_VALIDATION_DRIFT_BINS: int = 20
+DATA_VALIDATION_DRIFT_SAMPLE_SIZE: int = 100_000
+DATA_VALIDATION_DRIFT_PSI_THRESHOLD: float = 0.2
+DATA_VALIDATION_DRIFT_KS_THRESHOLD: float = 0.1
+# Fail validation, and so stop the pipeline, when drift is detected
+DATA_VALIDATION_DRIFT_GATE: bool = False
 
 
 
@@ -80,7 +103,11 @@ Data Transformation ralated constant start with DATA_TRANSFORMATION VAR NAME
 
 DATA_TRANSFORMATION_DIR_NAME: str = "data_transformation"
 DATA_TRANSFORMATION_TRANSFORMED_DATA_DIR: str = "transformed"
-# DATA_TRANSFORMATION_TRANSFORMED_OBJECT_DIR: str = "transformed_object"
+DATA_TRANSFORMATION_FEATURE_NAMES_FILE_NAME: str = "feature_names.yaml"
+# Transformed features are stored as a float32 matrix, the target as a separate vector
+DATA_TRANSFORMATION_FEATURE_DTYPE: str = "float32"
+DATA_TRANSFORMATION_TARGET_FILE_SUFFIX: str = "_target"
+DATA_TRANSFORMATION_TRANSFORMED_OBJECT_DIR: str = "transformed_object"
 
 
 
@@ -97,6 +124,18 @@ MODEL_TRAINER_TRAINED_MODEL_DIR: str = "trained_model"
 MODEL_TRAINER_TRAINED_MODEL_NAME: str = "model.pkl"
 MODEL_TRAINER_EXPECTED_SCORE: float = 0.6
 MODEL_TRAINER_MODEL_CONFIG_FILE_PATH: str = os.path.join("config", "model.yaml")
+MODEL_TRAINER_SEARCH_TRIALS_FILE_NAME: str = "search_trials.yaml"
+# "sklearn" trains the model.yaml estimator (with its search), "xgboost" the XGBRegressor configured below
+MODEL_TRAINER_BACKEND: str = "sklearn"
+MODEL_TRAINER_TREE_METHOD: str = "hist"
+MODEL_TRAINER_MAX_BIN: int = 256
+MODEL_TRAINER_EARLY_STOPPING_ROUNDS: int = 30
+# Share of the training split held out to early stop the xgboost backend
+MODEL_TRAINER_VALIDATION_SPLIT: float = 0.1
+# Train the xgboost backend from memory-mapped chunks through an external-memory DMatrix
+MODEL_TRAINER_OUT_OF_CORE: bool = False
+MODEL_TRAINER_CHUNK_ROWS: int = 100_000
+MODEL_TRAINER_EXTERNAL_MEMORY_CACHE_DIR: str = "xgb_cache"
 objective: str = "reg:squarederror"
 MODEL_TRAINER_N_ESTIMATORS: int=300
 gamma: float = 0.1
@@ -124,10 +163,36 @@ MIN_SAMPLES_SPLIT_MAX_DEPTH: int = 5
 MODEL Evaluation related constants
 """
 MODEL_EVALUATION_CHANGED_THRESHOLD_SCORE: float = 0.02
+# Time-ordered blocks of the test split both models are scored on, in parallel processes
+MODEL_EVALUATION_N_FOLDS: int = 5
+MODEL_EVALUATION_N_JOBS: int = -1
 MODEL_BUCKET_NAME = "mlopsproj949"
 MODEL_PUSHER_S3_KEY = "model-registry"
 
 
+"""
+Model serving related constants
+"""
+MODEL_CACHE_TTL_SECONDS: int = 60
+MODEL_CACHE_DIR: str = os.getenv("MODEL_CACHE_DIR", "model_cache")
+MODEL_CACHE_VERSIONS_DIR_NAME: str = "versions"
+MODEL_CACHE_PACKED_DIR_NAME: str = "packed"
+MODEL_CACHE_MAX_VERSIONS: int = 3
+MODEL_CACHE_USE_PACKED_MODEL: bool = True
+PREDICTION_BATCH_MAX_ROWS: int = 50000
+PREDICTION_COALESCE_WINDOW_MS: float = 2.0
+PREDICTION_COALESCE_MAX_BATCH_SIZE: int = 64
+PREDICTION_EXECUTOR_MAX_WORKERS: int = 4
+TRAINING_EXECUTOR_MAX_WORKERS: int = 1
+TRAINING_JOBS_DIR: str = os.path.join(ARTIFACT_DIR, "training_jobs")
+TRAINING_JOBS_MAX_CONCURRENT: int = 1
+# Hand DataFrames/arrays between training stages in memory; files are still written in the background
+TRAINING_PIPELINE_IN_MEMORY: bool = False
+# Reuse a previous run's stage artifact when the stage's inputs are unchanged
+TRAINING_PIPELINE_STAGE_CACHE: bool = True
+TRAINING_PIPELINE_STAGE_CACHE_DIR: str = os.path.join(ARTIFACT_DIR, "stage_cache")
+
+
 
 APP_HOST = "0.0.0.0"
 APP_PORT = 5000
\ No newline at end of file
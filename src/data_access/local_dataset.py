@@ -0,0 +1,108 @@
+import glob
+import os
+import sys
+from typing import Iterator, Optional
+
+import pandas as pd
+
+from src.constants import (DATA_INGESTION_DATE_COLUMN, DATA_INGESTION_HOUR_COLUMN, DATA_INGESTION_DATE_FORMAT,
+                           DATA_INGESTION_KEY_COLUMNS)
+from src.exception import MyException
+from src.logger import logging
+from src.utils.date_features import DateFeatureExtractor
+from src.utils.main_utils import read_yaml_file, write_yaml_file
+
+
+class PartitionedDataset:
+    """
+    Locally stored copy of the source table, partitioned by month of the Date column:
+
+        <dataset_dir>/part-<YYYY_MM>.parquet
+
+    plus a watermark file recording the latest (Date, Hour) ingested, so only newer rows
+    have to be fetched from Databricks on the next run.
+    """
+
+    def __init__(self, dataset_dir: str, watermark_file_path: str):
+        """
+        :param dataset_dir: Directory holding the partition files
+        :param watermark_file_path: YAML file holding the high-water mark
+        """
+        self.dataset_dir = dataset_dir
+        self.watermark_file_path = watermark_file_path
+
+    def read_watermark(self) -> Optional[dict]:
+        if not os.path.exists(self.watermark_file_path):
+            return None
+        return read_yaml_file(self.watermark_file_path)
+
+    def write_watermark(self, watermark: dict) -> None:
+        tmp_file_path = f"{self.watermark_file_path}.{os.getpid()}.tmp"
+        write_yaml_file(tmp_file_path, watermark)
+        os.replace(tmp_file_path, self.watermark_file_path)
+
+    @staticmethod
+    def _parse_dates(dataframe: pd.DataFrame) -> pd.Series:
+        return DateFeatureExtractor(date_format=DATA_INGESTION_DATE_FORMAT).parse(dataframe[DATA_INGESTION_DATE_COLUMN])
+
+    def _partition_file_path(self, partition: str) -> str:
+        return os.path.join(self.dataset_dir, f"part-{partition}.parquet")
+
+    def append(self, dataframe: pd.DataFrame) -> Optional[dict]:
+        """
+        Merges new rows into their monthly partitions, replacing rows with the same key.
+        Returns the (date, hour) high-water mark of the appended rows, or None if empty.
+        """
+        if dataframe.empty:
+            return None
+        try:
+            os.makedirs(self.dataset_dir, exist_ok=True)
+            dates = self._parse_dates(dataframe)
+            for partition, part_df in dataframe.groupby(dates.dt.strftime("%Y_%m")):
+                file_path = self._partition_file_path(partition)
+                if os.path.exists(file_path):
+                    part_df = pd.concat([pd.read_parquet(file_path), part_df], ignore_index=True)
+                part_df = part_df.drop_duplicates(subset=DATA_INGESTION_KEY_COLUMNS, keep="last")
+                tmp_file_path = f"{file_path}.{os.getpid()}.tmp"
+                part_df.to_parquet(tmp_file_path, index=False)
+                os.replace(tmp_file_path, file_path)
+
+            latest = pd.DataFrame({"date": dates, "hour": dataframe[DATA_INGESTION_HOUR_COLUMN].astype(int)})
+            latest = latest.sort_values(["date", "hour"]).iloc[-1]
+            return {"date": latest["date"].strftime("%Y-%m-%d"), "hour": int(latest["hour"])}
+        except Exception as e:
+            raise MyException(e, sys) from e
+
+    def partition_files(self) -> list:
+        return sorted(glob.glob(os.path.join(self.dataset_dir, "part-*.parquet")))
+
+    def iter_partitions(self) -> Iterator[pd.DataFrame]:
+        """
+        Yields the stored data one monthly partition at a time, oldest first.
+        """
+        for file_path in self.partition_files():
+            yield pd.read_parquet(file_path)
+
+    def date_counts(self) -> pd.Series:
+        """
+        Number of stored rows per date, reading only the Date column of each partition.
+        """
+        try:
+            counts = [self._parse_dates(pd.read_parquet(file_path, columns=[DATA_INGESTION_DATE_COLUMN])).value_counts()
+                      for file_path in self.partition_files()]
+            if not counts:
+                raise FileNotFoundError(f"No data stored in {self.dataset_dir}")
+            return pd.concat(counts).groupby(level=0).sum()
+        except Exception as e:
+            raise MyException(e, sys) from e
+
+    def read_all(self) -> pd.DataFrame:
+        try:
+            partitions = list(self.iter_partitions())
+            if not partitions:
+                raise FileNotFoundError(f"No data stored in {self.dataset_dir}")
+            dataframe = pd.concat(partitions, ignore_index=True)
+            logging.info(f"Read {len(dataframe)} rows from {len(partitions)} local partitions")
+            return dataframe
+        except Exception as e:
+            raise MyException(e, sys) from e
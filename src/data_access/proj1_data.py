@@ -1,9 +1,11 @@
 import pandas as pd
+import pyarrow as pa
 from databricks import sql
 import os
+from typing import Iterator
 from dotenv import load_dotenv
 load_dotenv('.env')
-from src.constants import DEFAULT_CATALOG, DEFAULT_SCHEMA, DEFAULT_TABLE, DATABRICKS_HOST, DATABRICKS_HTTP_PATH, DATABRICKS_TOKEN
+from src.constants import DEFAULT_CATALOG, DEFAULT_SCHEMA, DEFAULT_TABLE, DATABRICKS_HOST, DATABRICKS_HTTP_PATH, DATABRICKS_TOKEN, DATA_INGESTION_BATCH_SIZE
 
 
 class Source_Connectors:
@@ -58,3 +60,23 @@ class Source_Connectors:
             # re-raise so upstream code can handle/log appropriately
             raise
 
+
+    def iter_record_batches(self, sql_query: str = None, batch_size: int = DATA_INGESTION_BATCH_SIZE) -> Iterator[pa.Table]:
+        """
+        Execute a SQL query against Databricks and yield the result as Arrow tables of at most
+        batch_size rows, so the full result never has to be held in memory at once.
+        If sql_query is None, it will SELECT * from the configured table.
+        """
+        query = sql_query or f"SELECT * FROM {self.full_table_name};"
+        with sql.connect(
+            server_hostname=self.host,
+            http_path=self.http_path,
+            access_token=self.token
+        ) as connection:
+            with connection.cursor() as cursor:
+                cursor.execute(query)
+                while True:
+                    arrow_batch = cursor.fetchmany_arrow(batch_size)
+                    if arrow_batch.num_rows == 0:
+                        break
+                    yield arrow_batch
@@ -1,4 +1,8 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
 
 
 
@@ -7,6 +11,10 @@ from dataclasses import dataclass
 class DataIngestionArtifact:
     trained_file_path:str
     test_file_path:str
+    file_format:str = "parquet"
+    # In-memory copies of the splits, set when the pipeline runs with in_memory=True
+    train_df:Optional[pd.DataFrame] = field(default=None, repr=False, metadata={"in_memory": True})
+    test_df:Optional[pd.DataFrame] = field(default=None, repr=False, metadata={"in_memory": True})
 
 
 
@@ -16,17 +24,36 @@ class DataValidationArtifact:
     validation_status: bool
     message: str
     validation_report_file_path: str
+    drift_profile_file_path: Optional[str] = None
    
 @dataclass
 class DataTransformationArtifact:
-    # transformed_object_file_path:str
+    transformed_object_file_path:str
+    # Feature matrices (float32, feature_names order) and the matching target vectors
     transformed_train_file_path:str
     transformed_test_file_path:str
+    transformed_train_target_file_path:str
+    transformed_test_target_file_path:str
+    feature_names_file_path:str
+    # In-memory copies of the arrays, feature names and fitted transformer, set when the pipeline runs with in_memory=True
+    train_arr:Optional[np.ndarray] = field(default=None, repr=False, metadata={"in_memory": True})
+    test_arr:Optional[np.ndarray] = field(default=None, repr=False, metadata={"in_memory": True})
+    train_target:Optional[np.ndarray] = field(default=None, repr=False, metadata={"in_memory": True})
+    test_target:Optional[np.ndarray] = field(default=None, repr=False, metadata={"in_memory": True})
+    feature_names:Optional[List[str]] = field(default=None, repr=False, metadata={"in_memory": True})
+    preprocessing_object:Optional[object] = field(default=None, repr=False, metadata={"in_memory": True})
    
    
 @dataclass
 class RegressorMetricArtifact:
+    # Scores on the held-out test split, computed once by the trainer
     R2_score:float
+    rmse:Optional[float] = None
+    mae:Optional[float] = None
+    # Out-of-sample R2 known from training itself: RandomForest out-of-bag ("oob"), the
+    # xgboost early-stopping fold ("validation_fold") or the search's cross-validation ("cv")
+    validation_R2_score:Optional[float] = None
+    validation_source:Optional[str] = None
     # precision_score:float
     # recall_score:float    
    
@@ -37,6 +64,10 @@ class RegressorMetricArtifact:
 class ModelTrainerArtifact:
     trained_model_file_path:str
     metric_artifact:RegressorMetricArtifact
+    # Every hyperparameter search trial, None if the trainer ran without a search
+    search_trials_file_path:Optional[str] = None
+    # The trained MyModel, set when the pipeline runs with in_memory=True
+    trained_model:Optional[object] = field(default=None, repr=False, metadata={"in_memory": True})
    
    
    
@@ -0,0 +1,83 @@
+import sys
+from typing import Iterator, Optional, Tuple
+
+import numpy as np
+import xgboost as xgb
+
+from src.exception import MyException
+
+
+def iter_array_chunks(features: np.ndarray, target: np.ndarray, chunk_rows: int) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+    """
+    Yields consecutive (features, target) row slices; on memory-mapped arrays only the slice
+    being used is paged in.
+    """
+    for start in range(0, len(features), chunk_rows):
+        yield features[start:start + chunk_rows], target[start:start + chunk_rows]
+
+
+class ArrayChunkIter(xgb.DataIter):
+    """
+    Feeds a transformed feature matrix and its target vector to XGBoost chunk by chunk,
+    so an external-memory DMatrix can be built from a memory-mapped .npy file larger than RAM.
+
+    The rows are in time order and the validation subset is the trailing validation_split share
+    of them, so early stopping measures forecasting of later hours instead of interpolation
+    between neighbouring ones.
+    """
+
+    def __init__(self, features: np.ndarray, target: np.ndarray, chunk_rows: int, subset: str = "all",
+                 validation_split: float = 0.0, cache_prefix: Optional[str] = None):
+        """
+        :param features: Transformed feature matrix, typically np.load(..., mmap_mode="r")
+        :param target: Target vector with one value per feature row
+        :param subset: "all", "fit" (rows before the held-out ones) or "validation" (the trailing rows)
+        :param validation_split: Share of the rows, taken from the end, held out as validation rows
+        :param cache_prefix: Where XGBoost pages the quantized data to; None keeps it in memory
+        """
+        self.features = features
+        self.target = target
+        self.chunk_rows = chunk_rows
+        self.subset = subset
+        n_fit = len(features) - (max(1, int(len(features) * validation_split)) if subset != "all" else 0)
+        self._start, self._stop = (n_fit, len(features)) if subset == "validation" else (0, n_fit)
+        self._chunk_index = 0
+        super().__init__(cache_prefix=cache_prefix)
+
+    def _chunk(self, chunk_index: int) -> Tuple[np.ndarray, np.ndarray]:
+        start = self._start + chunk_index * self.chunk_rows
+        stop = min(start + self.chunk_rows, self._stop)
+        return (np.asarray(self.features[start:stop], dtype=np.float32),
+                np.asarray(self.target[start:stop], dtype=np.float32))
+
+    def next(self, input_data) -> bool:
+        if self._start + self._chunk_index * self.chunk_rows >= self._stop:
+            return False
+        features, target = self._chunk(self._chunk_index)
+        self._chunk_index += 1
+        input_data(data=features, label=target)
+        return True
+
+    def reset(self) -> None:
+        self._chunk_index = 0
+
+
+class BoosterRegressor:
+    """
+    Wraps a native xgboost Booster trained with xgb.train so it predicts like a scikit-learn
+    regressor, using only the trees up to the best early-stopping iteration.
+    """
+
+    def __init__(self, booster: xgb.Booster, best_iteration: Optional[int] = None):
+        self.booster = booster
+        self.best_iteration = best_iteration
+
+    def predict(self, X) -> np.ndarray:
+        try:
+            iteration_range = (0, 0) if self.best_iteration is None else (0, self.best_iteration + 1)
+            return self.booster.inplace_predict(np.asarray(X, dtype=np.float32), iteration_range=iteration_range)
+        except Exception as e:
+            raise MyException(e, sys) from e
+
+    def __repr__(self):
+        return f"BoosterRegressor(best_iteration={self.best_iteration})"
@@ -26,7 +26,13 @@ class DataIngestionConfig:
     training_file_path: str = os.path.join(data_ingestion_dir, DATA_INGESTION_INGESTED_DIR, TRAIN_FILE_NAME)
     testing_file_path: str = os.path.join(data_ingestion_dir, DATA_INGESTION_INGESTED_DIR, TEST_FILE_NAME)
     train_test_split_ratio: float = DATA_INGESTION_TRAIN_TEST_SPLIT_RATIO
+    file_format: str = ARTIFACT_FILE_FORMAT
     collection_name:str = DATA_INGESTION_COLLECTION_NAME
+    streaming: bool = DATA_INGESTION_STREAMING
+    batch_size: int = DATA_INGESTION_BATCH_SIZE
+    incremental: bool = DATA_INGESTION_INCREMENTAL
+    dataset_dir: str = DATA_INGESTION_DATASET_DIR
+    watermark_file_path: str = os.path.join(DATA_INGESTION_DATASET_DIR, DATA_INGESTION_WATERMARK_FILE_NAME)
 
 
 
@@ -35,17 +41,35 @@ class DataIngestionConfig:
 class DataValidationConfig:
     data_validation_dir: str = os.path.join(training_pipeline_config.artifact_dir, DATA_VALIDATION_DIR_NAME)
     data_validation_file_path: str = os.path.join(data_validation_dir,DATA_VALIDATION_REPORT_FILE_NAME)
+    max_null_ratio: float = DATA_VALIDATION_MAX_NULL_RATIO
+    batch_size: int = DATA_VALIDATION_BATCH_SIZE
+    drift_profile_file_path: str = os.path.join(data_validation_dir, DATA_VALIDATION_DRIFT_PROFILE_FILE_NAME)
+    drift_reference_file_path: str = DATA_VALIDATION_DRIFT_REFERENCE_FILE_PATH
+    drift_bins: int = DATA_VALIDATION_DRIFT_BINS
+    drift_sample_size: int = DATA_VALIDATION_DRIFT_SAMPLE_SIZE
+    drift_psi_threshold: float = DATA_VALIDATION_DRIFT_PSI_THRESHOLD
+    drift_ks_threshold: float = DATA_VALIDATION_DRIFT_KS_THRESHOLD
+    drift_gate: bool = DATA_VALIDATION_DRIFT_GATE
    
 @dataclass
 class DataTransformationConfig:
     data_transformation_dir: str = os.path.join(training_pipeline_config.artifact_dir, DATA_TRANSFORMATION_DIR_NAME)
     transformed_train_file_path: str = os.path.join(data_transformation_dir, DATA_TRANSFORMATION_TRANSFORMED_DATA_DIR,
-                                                    TRAIN_FILE_NAME.replace("csv", "npy"))
+                                                    os.path.splitext(TRAIN_FILE_NAME)[0] + ".npy")
     transformed_test_file_path: str = os.path.join(data_transformation_dir, DATA_TRANSFORMATION_TRANSFORMED_DATA_DIR,
-                                                   TEST_FILE_NAME.replace("csv", "npy"))
-    # transformed_object_file_path: str = os.path.join(data_transformation_dir,
-    #                                                  DATA_TRANSFORMATION_TRANSFORMED_OBJECT_DIR,
-    #                                                  PREPROCESSING_OBJECT_FILE_NAME)
+                                                   os.path.splitext(TEST_FILE_NAME)[0] + ".npy")
+    transformed_train_target_file_path: str = os.path.join(data_transformation_dir, DATA_TRANSFORMATION_TRANSFORMED_DATA_DIR,
+                                                           os.path.splitext(TRAIN_FILE_NAME)[0]
+                                                           + DATA_TRANSFORMATION_TARGET_FILE_SUFFIX + ".npy")
+    transformed_test_target_file_path: str = os.path.join(data_transformation_dir, DATA_TRANSFORMATION_TRANSFORMED_DATA_DIR,
+                                                          os.path.splitext(TEST_FILE_NAME)[0]
+                                                          + DATA_TRANSFORMATION_TARGET_FILE_SUFFIX + ".npy")
+    feature_dtype: str = DATA_TRANSFORMATION_FEATURE_DTYPE
+    feature_names_file_path: str = os.path.join(data_transformation_dir, DATA_TRANSFORMATION_TRANSFORMED_DATA_DIR,
+                                                DATA_TRANSFORMATION_FEATURE_NAMES_FILE_NAME)
+    transformed_object_file_path: str = os.path.join(data_transformation_dir,
+                                                     DATA_TRANSFORMATION_TRANSFORMED_OBJECT_DIR,
+                                                     PREPROCESSING_OBJECT_FILE_NAME)
    
    
    
@@ -57,6 +81,15 @@ class ModelTrainerConfig:
     trained_model_file_path: str = os.path.join(model_trainer_dir, MODEL_TRAINER_TRAINED_MODEL_DIR, MODEL_FILE_NAME)
     expected_accuracy: float = MODEL_TRAINER_EXPECTED_SCORE
     model_config_file_path: str = MODEL_TRAINER_MODEL_CONFIG_FILE_PATH
+    search_trials_file_path: str = os.path.join(model_trainer_dir, MODEL_TRAINER_SEARCH_TRIALS_FILE_NAME)
+    backend: str = MODEL_TRAINER_BACKEND
+    tree_method: str = MODEL_TRAINER_TREE_METHOD
+    max_bin: int = MODEL_TRAINER_MAX_BIN
+    early_stopping_rounds: int = MODEL_TRAINER_EARLY_STOPPING_ROUNDS
+    validation_split: float = MODEL_TRAINER_VALIDATION_SPLIT
+    out_of_core: bool = MODEL_TRAINER_OUT_OF_CORE
+    chunk_rows: int = MODEL_TRAINER_CHUNK_ROWS
+    external_memory_cache_dir: str = os.path.join(model_trainer_dir, MODEL_TRAINER_EXTERNAL_MEMORY_CACHE_DIR)
     objective = objective
     _n_estimators = MODEL_TRAINER_N_ESTIMATORS
     gamma = gamma
@@ -79,6 +112,8 @@ class ModelTrainerConfig:
 @dataclass
 class ModelEvaluationConfig:
     changed_threshold_score: float = MODEL_EVALUATION_CHANGED_THRESHOLD_SCORE
+    n_folds: int = MODEL_EVALUATION_N_FOLDS
+    n_jobs: int = MODEL_EVALUATION_N_JOBS
     bucket_name: str = MODEL_BUCKET_NAME
     s3_model_key_path: str = MODEL_FILE_NAME
 
@@ -91,4 +126,9 @@ class ModelPusherConfig:
 class VehiclePredictorConfig:
     model_file_path: str = MODEL_FILE_NAME
     model_bucket_name: str = MODEL_BUCKET_NAME
+    model_cache_ttl_seconds: int = MODEL_CACHE_TTL_SECONDS
+    model_cache_dir: str = MODEL_CACHE_DIR
+    use_packed_model: bool = MODEL_CACHE_USE_PACKED_MODEL
+    coalesce_window_ms: float = PREDICTION_COALESCE_WINDOW_MS
+    coalesce_max_batch_size: int = PREDICTION_COALESCE_MAX_BATCH_SIZE
 
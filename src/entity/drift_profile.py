@@ -0,0 +1,202 @@
+import os
+import shutil
+import sys
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.exception import MyException
+from src.logger import logging
+from src.utils.main_utils import read_yaml_file, write_yaml_file
+
+
+# Added to every bin share so empty bins do not make PSI infinite
+PSI_EPSILON = 1e-4
+
+
+def _bin_counts(values: np.ndarray, edges: np.ndarray) -> np.ndarray:
+    """
+    Counts values into the bins between edges; values outside [edges[0], edges[-1]]
+    fall into the first/last bin, so data beyond the reference range is still counted.
+    """
+    values = values[~np.isnan(values)]
+    index = np.searchsorted(edges[1:-1], values, side="right")
+    return np.bincount(index, minlength=len(edges) - 1)
+
+
+def _psi(expected: np.ndarray, actual: np.ndarray) -> float:
+    expected = expected / max(expected.sum(), 1) + PSI_EPSILON
+    actual = actual / max(actual.sum(), 1) + PSI_EPSILON
+    return float(np.sum((actual - expected) * np.log(actual / expected)))
+
+
+def _ks(expected: np.ndarray, actual: np.ndarray) -> float:
+    # Kolmogorov-Smirnov distance evaluated at the bin edges
+    expected_cdf = np.cumsum(expected) / max(expected.sum(), 1)
+    actual_cdf = np.cumsum(actual) / max(actual.sum(), 1)
+    return float(np.max(np.abs(expected_cdf - actual_cdf)))
+
+
+class DriftProfile:
+    """
+    Compact distribution summary of a training snapshot: a quantile-binned histogram per
+    numerical feature and category counts per categorical feature.
+
+    Profiles are built from streamed batches in two passes: a bounded random sample of each
+    column picks the bin edges, then every row is counted into its bin. Neither pass sorts
+    the full data, so profiles scale with the number of rows, not their order statistics.
+    """
+
+    def __init__(self, rows: int, features: Dict[str, dict]):
+        """
+        :param rows: Number of rows profiled
+        :param features: {column: {"kind": "numerical", "edges": [...], "counts": [...]}} or
+                         {column: {"kind": "categorical", "counts": {category: count}}}
+        """
+        self.rows = rows
+        self.features = features
+
+    @classmethod
+    def load(cls, file_path: str) -> Optional["DriftProfile"]:
+        """
+        Returns the profile stored at file_path, None if there is none.
+        """
+        if not os.path.exists(file_path):
+            return None
+        try:
+            content = read_yaml_file(file_path)
+            return cls(rows=content["rows"], features=content["features"])
+        except Exception as e:
+            raise MyException(e, sys) from e
+
+    def save(self, file_path: str) -> None:
+        try:
+            write_yaml_file(file_path, {"rows": self.rows, "features": self.features}, replace=True)
+        except Exception as e:
+            raise MyException(e, sys) from e
+
+    @staticmethod
+    def promote(profile_file_path: str, reference_file_path: str) -> None:
+        """
+        Makes a run's profile the reference that later runs are compared against.
+        """
+        try:
+            os.makedirs(os.path.dirname(reference_file_path), exist_ok=True)
+            tmp_file_path = f"{reference_file_path}.{os.getpid()}.tmp"
+            shutil.copyfile(profile_file_path, tmp_file_path)
+            os.replace(tmp_file_path, reference_file_path)
+            logging.info(f"Drift reference profile updated from {profile_file_path}")
+        except Exception as e:
+            raise MyException(e, sys) from e
+
+    @staticmethod
+    def _sample(batches: Iterable[pd.DataFrame], columns: List[str], sample_size: int,
+                random_state: int) -> Dict[str, np.ndarray]:
+        """
+        Uniform sample of up to sample_size rows: every row gets a random key and the rows with
+        the smallest keys are kept, selected per batch with argpartition.
+        """
+        rng = np.random.default_rng(random_state)
+        keys = np.empty(0)
+        sample = {column: np.empty(0) for column in columns}
+        for batch in batches:
+            batch_keys = rng.random(len(batch))
+            keys = np.concatenate([keys, batch_keys])
+            for column in columns:
+                values = pd.to_numeric(batch[column], errors="coerce").to_numpy(dtype=np.float64, na_value=np.nan)
+                sample[column] = np.concatenate([sample[column], values])
+            if len(keys) > sample_size:
+                keep = np.argpartition(keys, sample_size)[:sample_size]
+                keys = keys[keep]
+                sample = {column: values[keep] for column, values in sample.items()}
+        return sample
+
+    @classmethod
+    def build(cls, batches_fn: Callable[[], Iterable[pd.DataFrame]], numerical_columns: List[str],
+              categorical_columns: List[str], n_bins: int = 20, sample_size: int = 100_000,
+              reference: "DriftProfile" = None, random_state: int = 42) -> Tuple["DriftProfile", Optional[Dict[str, dict]]]:
+        """
+        Profiles the data yielded by batches_fn, which is called once per pass.
+        If a reference is given, the same pass also counts the data into the reference's bins.
+
+        :return: (profile, features counted on the reference bins or None)
+        """
+        try:
+            sample = cls._sample(batches_fn(), numerical_columns, sample_size, random_state)
+            edges = {}
+            for column, values in sample.items():
+                values = values[~np.isnan(values)]
+                if values.size == 0:
+                    continue
+                column_edges = np.unique(np.quantile(values, np.linspace(0, 1, n_bins + 1)))
+                # A constant column still needs one bin
+                edges[column] = column_edges if column_edges.size > 1 else np.repeat(column_edges, 2)
+
+            reference_features = {} if reference is None else reference.features
+            reference_edges = {column: np.asarray(feature["edges"]) for column, feature in reference_features.items()
+                               if feature["kind"] == "numerical"}
+
+            rows = 0
+            counts = {column: np.zeros(len(column_edges) - 1, dtype=np.int64) for column, column_edges in edges.items()}
+            reference_counts = {column: np.zeros(len(column_edges) - 1, dtype=np.int64)
+                                for column, column_edges in reference_edges.items() if column in numerical_columns}
+            category_counts = {column: pd.Series(dtype=np.int64) for column in categorical_columns}
+            for batch in batches_fn():
+                rows += len(batch)
+                for column in numerical_columns:
+                    if column not in counts and column not in reference_counts:
+                        continue
+                    values = pd.to_numeric(batch[column], errors="coerce").to_numpy(dtype=np.float64, na_value=np.nan)
+                    if column in counts:
+                        counts[column] += _bin_counts(values, edges[column])
+                    if column in reference_counts:
+                        reference_counts[column] += _bin_counts(values, reference_edges[column])
+                for column in categorical_columns:
+                    batch_counts = batch[column].astype(str).value_counts()
+                    category_counts[column] = category_counts[column].add(batch_counts, fill_value=0)
+
+            features = {column: {"kind": "numerical", "edges": edges[column].tolist(),
+                                 "counts": counts[column].tolist()} for column in edges}
+            categorical = {column: {"kind": "categorical",
+                                    "counts": {str(k): int(v) for k, v in category_counts[column].items()}}
+                           for column in categorical_columns}
+            features.update(categorical)
+
+            on_reference_bins = None
+            if reference is not None:
+                on_reference_bins = {column: {"kind": "numerical", "counts": reference_counts[column].tolist()}
+                                     for column in reference_counts}
+                on_reference_bins.update({column: feature for column, feature in categorical.items()
+                                          if column in reference_features})
+            return cls(rows=rows, features=features), on_reference_bins
+        except Exception as e:
+            raise MyException(e, sys) from e
+
+    def compare(self, current: Dict[str, dict], psi_threshold: float, ks_threshold: float) -> dict:
+        """
+        PSI and KS of each feature counted on this (reference) profile's bins.
+        A feature drifts when its PSI exceeds psi_threshold or, for numerical features,
+        its KS distance exceeds ks_threshold.
+
+        :param current: Features as returned by build(..., reference=self)
+        """
+        report = {}
+        for column, feature in current.items():
+            reference_feature = self.features[column]
+            if feature["kind"] == "numerical":
+                expected = np.asarray(reference_feature["counts"], dtype=np.float64)
+                actual = np.asarray(feature["counts"], dtype=np.float64)
+                ks = _ks(expected, actual)
+            else:
+                categories = sorted(set(reference_feature["counts"]) | set(feature["counts"]))
+                expected = np.array([reference_feature["counts"].get(c, 0) for c in categories], dtype=np.float64)
+                actual = np.array([feature["counts"].get(c, 0) for c in categories], dtype=np.float64)
+                ks = None
+            psi = _psi(expected, actual)
+            drift = psi > psi_threshold or (ks is not None and ks > ks_threshold)
+            report[column] = {"psi": round(psi, 6), "ks": None if ks is None else round(ks, 6), "drift": bool(drift)}
+
+        drifted_features = [column for column, result in report.items() if result["drift"]]
+        return {"drift_detected": len(drifted_features) > 0, "drifted_features": drifted_features,
+                "reference_rows": self.rows, "features": report}
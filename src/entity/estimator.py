@@ -1,6 +1,8 @@
 import sys
+from typing import List, Optional, Tuple
 
 
+import numpy as np
 import pandas as pd
 from pandas import DataFrame
 from sklearn.pipeline import Pipeline
@@ -22,14 +24,72 @@ from src.logger import logging
 
 
 class MyModel:
-    def __init__(self, trained_model_object: object):
-    #def __init__(self, preprocessing_object: Pipeline, trained_model_object: object):
+    def __init__(self, trained_model_object: object, feature_names: Optional[List[str]] = None,
+                 preprocessing_object: object = None):
         """
-        :param preprocessing_object: Input Object of preprocesser
         :param trained_model_object: Input Object of trained model
+        :param feature_names: Ordered feature columns the model was trained on (target excluded)
+        :param preprocessing_object: Fitted feature transformer (BikeFeatureTransformer) turning
+                                     raw or serving inputs into the trained feature matrix
         """
-       # self.preprocessing_object = preprocessing_object
+        self.preprocessing_object = preprocessing_object
         self.trained_model_object = trained_model_object
+        self.feature_names = list(feature_names) if feature_names else None
+        self._alignment_plans = {}
+
+
+    def __getstate__(self):
+        # Alignment plans are a per-process cache, do not persist them with the model
+        state = self.__dict__.copy()
+        state.pop("_alignment_plans", None)
+        return state
+
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        # Models pickled before feature names were bundled do not carry them
+        self.__dict__.setdefault("feature_names", None)
+        self.__dict__.setdefault("preprocessing_object", None)
+        self._alignment_plans = {}
+
+
+    def get_alignment_plan(self, columns: Tuple[str, ...]) -> np.ndarray:
+        """
+        Returns, for each trained feature, the index of the matching input column.
+        Features absent from the input point one past the last column, which is the zero pad.
+        Plans are compiled once per distinct input column layout and reused.
+        """
+        plan = self._alignment_plans.get(columns)
+        if plan is None:
+            position = {column: index for index, column in enumerate(columns)}
+            pad_index = len(columns)
+            plan = np.array([position.get(feature, pad_index) for feature in self.feature_names], dtype=np.intp)
+
+            missing = [feature for feature in self.feature_names if feature not in position]
+            if missing:
+                logging.warning(f"Input is missing {len(missing)} trained features, they will be zero-filled: {missing}")
+            self._alignment_plans[columns] = plan
+        return plan
+
+
+    def align_features(self, dataframe: DataFrame) -> np.ndarray:
+        """
+        Reorders/selects dataframe columns into the trained feature order with a single take,
+        zero-filling trained features the input does not provide.
+        """
+        return self.align_array(dataframe.to_numpy(dtype=np.float64), tuple(dataframe.columns))
+
+
+    def align_array(self, values: np.ndarray, columns: Tuple[str, ...]) -> np.ndarray:
+        """
+        Same as align_features for a 2-D float array whose columns are named by columns.
+        """
+        plan = self.get_alignment_plan(columns)
+        if len(plan) == len(columns) and np.array_equal(plan, np.arange(len(columns))):
+            return values
+        padded = np.zeros((values.shape[0], values.shape[1] + 1), dtype=np.float64)
+        padded[:, :-1] = values
+        return padded.take(plan, axis=1)
 
 
     def predict(self, dataframe: pd.DataFrame) -> DataFrame:
@@ -40,6 +100,17 @@ class MyModel:
         try:
             logging.info("Starting prediction process.")
 
+            if self.preprocessing_object is not None:
+                transformed_feature = self.preprocessing_object.transform_frame(dataframe)
+                logging.info("Using the trained model to get predictions")
+                return self.trained_model_object.predict(transformed_feature)
+
+            # Align by name when the model carries its trained feature names
+            if self.feature_names and hasattr(dataframe, "columns"):
+                transformed_feature = self.align_features(dataframe)
+                logging.info("Using the trained model to get predictions")
+                return self.trained_model_object.predict(transformed_feature)
+
             # Use the dataframe as-is unless custom preprocessing is provided
             transformed_feature = dataframe
 
@@ -105,6 +176,24 @@ class MyModel:
 
 
 
+    def predict_array(self, features: np.ndarray, columns: Tuple[str, ...]) -> np.ndarray:
+        """
+        Predicts on a 2-D float array with named columns, without going through pandas.
+        """
+        try:
+            if self.preprocessing_object is not None:
+                return self.trained_model_object.predict(self.preprocessing_object.transform_array(features, columns))
+            if not self.feature_names:
+                # Legacy models without feature names go through the count-based alignment
+                return self.predict(DataFrame(features, columns=list(columns)))
+            return self.trained_model_object.predict(self.align_array(features, columns))
+        except Exception as e:
+            logging.error("Error occurred in predict_array method", exc_info=True)
+            raise MyException(e, sys) from e
+
+
+
+
     def __repr__(self):
         return f"{type(self.trained_model_object).__name__}()"
 
@@ -0,0 +1,204 @@
+import sys
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from pandas import DataFrame
+
+from src.constants import DATA_INGESTION_DATE_COLUMN, DATA_INGESTION_DATE_FORMAT
+from src.exception import MyException
+from src.logger import logging
+from src.utils.date_features import DateFeatureExtractor
+
+
+# Default date features derived from the date column, in output order. The serving form
+# provides exactly these; "dayofweek" and "is_weekend" are also available.
+DATE_FEATURES: Tuple[str, ...] = ("month", "day")
+
+# Serving input names (form fields / BikeFeatureVector) mapped to the training feature names
+SERVING_ALIASES: Dict[str, str] = {
+    "Temperature": "Temperature(�C)",
+    "Humidity": "Humidity(%)",
+    "Wind_speed": "Wind speed (m/s)",
+    "Visibility": "Visibility (10m)",
+    "dew_point_temperature": "Dew point temperature(�C)",
+    "Solar_Radiation": "Solar Radiation (MJ/m2)",
+    "Rainfall": "Rainfall(mm)",
+    "snowfall": "Snowfall (cm)",
+    "Holiday_No_Holiday": "Holiday_No Holiday",
+    "Functioning_Day_Yes": "Functioning Day_Yes",
+}
+
+
+class BikeFeatureTransformer:
+    """
+    Feature engineering fitted on the training split and pickled with the model, so training,
+    evaluation and serving build exactly the same feature matrix.
+
+    The fitted state is the numerical column list, the category vocabulary of each categorical
+    column and the resulting output column order. Raw rows are turned into the feature matrix
+    with NumPy indexing only: numerical columns are copied, dates are split into date_features
+    (each distinct date string parsed once) and categories are one-hot encoded through their integer codes.
+
+    Serving inputs that are already one-hot encoded (e.g. the HTML form) go through
+    transform_array, which maps serving names to training names and rebuilds a dummy left out
+    of the input as 1 minus the other dummies of its column.
+    """
+
+    def __init__(self, numerical_columns: List[str], categorical_columns: List[str],
+                 date_column: str = DATA_INGESTION_DATE_COLUMN, date_format: str = DATA_INGESTION_DATE_FORMAT,
+                 serving_aliases: Dict[str, str] = None, date_features: Tuple[str, ...] = DATE_FEATURES):
+        """
+        :param numerical_columns: Numerical input columns, target excluded
+        :param categorical_columns: Columns one-hot encoded with the fitted vocabularies
+        :param date_column: Column the date features are derived from, dropped afterwards
+        :param date_format: strptime format of the date column
+        :param serving_aliases: Serving input names mapped to training feature names
+        :param date_features: Features taken from the date column, see src.utils.date_features.DATE_FEATURE_NAMES
+        """
+        self.numerical_columns = list(numerical_columns)
+        self.categorical_columns = list(categorical_columns)
+        self.date_column = date_column
+        self.date_format = date_format
+        self.serving_aliases = dict(SERVING_ALIASES if serving_aliases is None else serving_aliases)
+        self.date_features = tuple(date_features)
+        self.date_extractor = DateFeatureExtractor(date_format=date_format)
+        self.categories_: Optional[Dict[str, List[str]]] = None
+        self.feature_names_: Optional[List[str]] = None
+        self._serving_plans = {}
+
+    def __getstate__(self):
+        # Serving plans are a per-process cache, do not persist them
+        state = self.__dict__.copy()
+        state.pop("_serving_plans", None)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._serving_plans = {}
+
+    @property
+    def feature_names(self) -> List[str]:
+        return self.feature_names_
+
+    def fit(self, dataframe: DataFrame) -> "BikeFeatureTransformer":
+        """
+        Fixes the category vocabularies and the output column order from the training inputs.
+        """
+        try:
+            self.numerical_columns = [column for column in self.numerical_columns if column in dataframe.columns]
+            self.categories_ = {}
+            for column in self.categorical_columns:
+                values = dataframe[column].dropna().astype(str).unique()
+                self.categories_[column] = sorted(values)
+            self.feature_names_ = (self.numerical_columns + list(self.date_features)
+                                   + [f"{column}_{category}" for column in self.categorical_columns
+                                      for category in self.categories_[column]])
+            logging.info(f"Fitted feature transformer with {len(self.feature_names_)} features")
+            return self
+        except Exception as e:
+            raise MyException(e, sys) from e
+
+    def fit_transform(self, dataframe: DataFrame, dtype=np.float64) -> np.ndarray:
+        return self.fit(dataframe).transform(dataframe, dtype=dtype)
+
+    def is_raw(self, columns) -> bool:
+        """
+        True if the columns are raw inputs (date and category strings) rather than engineered features.
+        """
+        return self.date_column in columns or any(column in columns for column in self.categorical_columns)
+
+
+    def transform(self, dataframe: DataFrame, dtype=np.float64) -> np.ndarray:
+        """
+        Builds the feature matrix, in feature_names order, from raw input rows.
+        Categories outside the fitted vocabulary get all-zero dummies.
+
+        :param dtype: dtype of the matrix; training stores float32, which tree models split on anyway
+        """
+        try:
+            n_rows = len(dataframe)
+            features = np.zeros((n_rows, len(self.feature_names_)), dtype=dtype)
+            n_numerical = len(self.numerical_columns)
+            if n_numerical:
+                features[:, :n_numerical] = dataframe[self.numerical_columns].to_numpy(dtype=dtype)
+            date_features = self.date_extractor.transform(dataframe[self.date_column], features=self.date_features)
+            for index, name in enumerate(self.date_features):
+                features[:, n_numerical + index] = date_features[name]
+
+            offset = n_numerical + len(self.date_features)
+            rows = np.arange(n_rows)
+            for column in self.categorical_columns:
+                vocabulary = self.categories_[column]
+                codes = pd.Categorical(dataframe[column].astype(str), categories=vocabulary).codes
+                known = codes >= 0
+                if not known.all():
+                    unknown = dataframe[column][~known & dataframe[column].notna().to_numpy()].unique()
+                    if len(unknown):
+                        logging.warning(f"Unknown {column} categories encoded as all-zero dummies: {list(unknown)}")
+                features[rows[known], offset + codes[known]] = 1.0
+                offset += len(vocabulary)
+            return features
+        except Exception as e:
+            raise MyException(e, sys) from e
+
+    def get_serving_plan(self, columns: Tuple[str, ...]) -> Tuple[np.ndarray, List[Tuple[int, np.ndarray]]]:
+        """
+        Compiles, once per distinct input column layout, how engineered serving inputs map to features:
+        a take index per feature (one past the last input column is the zero pad) and the dummies
+        derived as 1 minus the sum of the other dummies of their column.
+        """
+        plan = self._serving_plans.get(columns)
+        if plan is not None:
+            return plan
+
+        position = {}
+        for index, column in enumerate(columns):
+            position[self.serving_aliases.get(column, column)] = index
+        pad_index = len(columns)
+        take_index = np.array([position.get(feature, pad_index) for feature in self.feature_names_], dtype=np.intp)
+
+        feature_index = {feature: index for index, feature in enumerate(self.feature_names_)}
+        derived, missing = [], []
+        for feature in self.feature_names_:
+            if feature in position:
+                continue
+            group = next((column for column in self.categorical_columns
+                          if feature in [f"{column}_{category}" for category in self.categories_[column]]), None)
+            if group is not None:
+                others = [f"{group}_{category}" for category in self.categories_[group] if f"{group}_{category}" != feature]
+                if all(other in position for other in others):
+                    derived.append((feature_index[feature], np.array([feature_index[other] for other in others],
+                                                                     dtype=np.intp)))
+                    continue
+            missing.append(feature)
+        if missing:
+            logging.warning(f"Input is missing {len(missing)} trained features, they will be zero-filled: {missing}")
+
+        plan = (take_index, derived)
+        self._serving_plans[columns] = plan
+        return plan
+
+    def transform_array(self, values: np.ndarray, columns: Tuple[str, ...]) -> np.ndarray:
+        """
+        Builds the feature matrix from a 2-D float array of engineered serving inputs named by columns.
+        """
+        take_index, derived = self.get_serving_plan(tuple(columns))
+        padded = np.zeros((values.shape[0], values.shape[1] + 1), dtype=np.float64)
+        padded[:, :-1] = values
+        features = padded.take(take_index, axis=1)
+        for index, others in derived:
+            features[:, index] = 1.0 - features[:, others].sum(axis=1)
+        return features
+
+    def transform_frame(self, dataframe: DataFrame) -> np.ndarray:
+        """
+        Builds the feature matrix from either raw rows or engineered serving inputs.
+        """
+        if self.is_raw(dataframe.columns):
+            return self.transform(dataframe)
+        return self.transform_array(dataframe.to_numpy(dtype=np.float64), tuple(dataframe.columns))
+
+    def __repr__(self):
+        n_features = None if self.feature_names_ is None else len(self.feature_names_)
+        return f"BikeFeatureTransformer(n_features={n_features})"
@@ -0,0 +1,83 @@
+import sys
+from typing import Mapping, Tuple
+
+import numpy as np
+
+from src.exception import MyException
+
+
+# Serving feature columns, in the fixed order of BikeFeatureVector.values
+FEATURE_COLUMNS: Tuple[str, ...] = (
+    "Hour",
+    "Temperature",
+    "Humidity",
+    "Wind_speed",
+    "Visibility",
+    "dew_point_temperature",
+    "Solar_Radiation",
+    "Rainfall",
+    "snowfall",
+    "month",
+    "day",
+    "Seasons_Spring",
+    "Seasons_Summer",
+    "Seasons_Winter",
+    "Holiday_No_Holiday",
+    "Functioning_Day_Yes",
+)
+
+
+class BikeFeatureVector:
+    """
+    One prediction input stored as a float64 row in FEATURE_COLUMNS order.
+    Form or JSON input is parsed straight into the row, so the hot prediction path
+    never builds per-field attributes, dicts or a pandas DataFrame.
+    """
+
+    __slots__ = ("values",)
+
+    COLUMNS: Tuple[str, ...] = FEATURE_COLUMNS
+    _INDEX = {column: index for index, column in enumerate(FEATURE_COLUMNS)}
+
+    def __init__(self, values: np.ndarray):
+        """
+        :param values: float64 array of shape (len(FEATURE_COLUMNS),)
+        """
+        self.values = values
+
+    @staticmethod
+    def _to_float(value, default: float = 0.0) -> float:
+        try:
+            return float(value)
+        except (TypeError, ValueError):
+            return default
+
+    @classmethod
+    def from_mapping(cls, mapping: Mapping) -> "BikeFeatureVector":
+        """
+        Parses a form (starlette FormData) or a decoded JSON object into a feature vector.
+        Missing or unparsable fields default to 0, as the HTML form always did.
+        """
+        try:
+            to_float = cls._to_float
+            values = np.fromiter((to_float(mapping.get(column)) for column in FEATURE_COLUMNS),
+                                 dtype=np.float64, count=len(FEATURE_COLUMNS))
+            return cls(values)
+        except Exception as e:
+            raise MyException(e, sys) from e
+
+    def as_matrix(self) -> np.ndarray:
+        """
+        Returns the vector as a (1, n_features) view, ready for model predict.
+        """
+        return self.values.reshape(1, -1)
+
+    def __getitem__(self, column: str) -> float:
+        return float(self.values[self._INDEX[column]])
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{column}={value:g}" for column, value in zip(FEATURE_COLUMNS, self.values))
+        return f"BikeFeatureVector({fields})"
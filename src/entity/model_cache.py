@@ -0,0 +1,190 @@
+import glob
+import os
+import sys
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from src.constants import (MODEL_CACHE_TTL_SECONDS, MODEL_CACHE_DIR, MODEL_CACHE_PACKED_DIR_NAME,
+                           MODEL_CACHE_USE_PACKED_MODEL, ARTIFACT_DIR, TARGET_COLUMN, DATA_TRANSFORMATION_DIR_NAME,
+                           DATA_TRANSFORMATION_TRANSFORMED_DATA_DIR, DATA_TRANSFORMATION_FEATURE_NAMES_FILE_NAME)
+from src.entity.estimator import MyModel
+from src.entity.s3_estimator import Proj1Estimator
+from src.entity.packed_forest import is_packed_model, load_packed_model, pack_model
+from src.exception import MyException
+from src.logger import logging
+from src.utils.main_utils import read_yaml_file
+
+
+def find_latest_artifact_feature_names() -> Optional[List[str]]:
+    """
+    Returns the trained feature names from the most recent local artifact run, without the target.
+    Only used for models pickled before feature names were bundled with the model.
+    """
+    artifact_dirs = [d for d in glob.glob(os.path.join(ARTIFACT_DIR, "*")) if os.path.isdir(d)]
+    artifact_dirs.sort(key=lambda x: os.path.getmtime(x), reverse=True)
+    for d in artifact_dirs:
+        candidate = os.path.join(d, DATA_TRANSFORMATION_DIR_NAME, DATA_TRANSFORMATION_TRANSFORMED_DATA_DIR,
+                                 DATA_TRANSFORMATION_FEATURE_NAMES_FILE_NAME)
+        if os.path.exists(candidate):
+            feature_names = read_yaml_file(candidate)
+            if feature_names and feature_names[-1] == TARGET_COLUMN:
+                feature_names = feature_names[:-1]
+            return feature_names
+    return None
+
+
+class ResidentModelCache:
+    """
+    Process-wide cache that keeps the production model resident in memory.
+
+    The model is downloaded from S3 once per process. After ttl_seconds have elapsed,
+    the next request checks the object's ETag with a HEAD request and only re-downloads
+    the model when a new version has been pushed. The (model, version) pair is replaced
+    with a single assignment, so concurrent readers always see a consistent model.
+
+    With use_packed_model, tree ensembles are served from the memory-mapped packed format
+    stored under cache_dir/versions/<version>/packed, so all workers on a host share one copy of the
+    node arrays; only the first worker to see a version downloads and unpickles it.
+    """
+
+    _instances: Dict[Tuple[str, str], "ResidentModelCache"] = {}
+    _instances_lock = threading.Lock()
+
+    def __init__(self, bucket_name: str, model_path: str, ttl_seconds: int = MODEL_CACHE_TTL_SECONDS,
+                 cache_dir: str = MODEL_CACHE_DIR, use_packed_model: bool = MODEL_CACHE_USE_PACKED_MODEL):
+        """
+        :param bucket_name: Name of your model bucket
+        :param model_path: Location of your model in bucket
+        :param ttl_seconds: Seconds a loaded model is served before its ETag is checked again
+        :param cache_dir: Local directory holding downloaded and packed model versions
+        :param use_packed_model: Serve tree ensembles from memory-mapped packed node arrays
+        """
+        self.bucket_name = bucket_name
+        self.model_path = model_path
+        self.ttl_seconds = ttl_seconds
+        self.cache_dir = cache_dir
+        self.use_packed_model = use_packed_model
+        self.estimator = Proj1Estimator(bucket_name=bucket_name, model_path=model_path, cache_dir=cache_dir)
+        self._entry: Optional[Tuple[MyModel, str]] = None
+        self._checked_at: float = 0.0
+        self._load_lock = threading.Lock()
+
+    @classmethod
+    def get_instance(cls, bucket_name: str, model_path: str, ttl_seconds: int = MODEL_CACHE_TTL_SECONDS,
+                     cache_dir: str = MODEL_CACHE_DIR,
+                     use_packed_model: bool = MODEL_CACHE_USE_PACKED_MODEL) -> "ResidentModelCache":
+        """
+        Returns the shared cache for the given bucket/model path, creating it on first use.
+        """
+        key = (bucket_name, model_path)
+        instance = cls._instances.get(key)
+        if instance is None:
+            with cls._instances_lock:
+                instance = cls._instances.get(key)
+                if instance is None:
+                    instance = cls(bucket_name=bucket_name, model_path=model_path, ttl_seconds=ttl_seconds,
+                                   cache_dir=cache_dir, use_packed_model=use_packed_model)
+                    cls._instances[key] = instance
+        return instance
+
+    @property
+    def version(self) -> Optional[str]:
+        entry = self._entry
+        return entry[1] if entry is not None else None
+
+    def invalidate(self) -> None:
+        self._checked_at = 0.0
+
+    def _is_fresh(self) -> bool:
+        return self._entry is not None and time.monotonic() - self._checked_at < self.ttl_seconds
+
+    def get_model(self) -> MyModel:
+        """
+        Returns the resident model, refreshing it first if the TTL has expired.
+        """
+        entry = self._entry
+        if entry is not None and self._is_fresh():
+            return entry[0]
+
+        with self._load_lock:
+            # Another thread may have refreshed the model while we were waiting
+            if self._is_fresh():
+                return self._entry[0]
+            return self._refresh()
+
+    def _refresh(self) -> MyModel:
+        entry = self._entry
+        try:
+            # One HEAD request; the estimator keeps its encryption header for a download of this version
+            head = self.estimator.get_model_head()
+            version = head["etag"] if head is not None else None
+        except Exception as e:
+            if entry is None:
+                # Cold start while S3 is unreachable: serve the most recently used version on disk
+                version = self.estimator.local_cache.latest_version()
+                if version is None:
+                    raise MyException(e, sys)
+                logging.warning(f"Could not check model version, loading cached version {version}: {e}")
+                try:
+                    model = self._load_version(version)
+                except Exception as load_error:
+                    raise MyException(load_error, sys)
+                self._entry = (model, version)
+                self._checked_at = time.monotonic()
+                return model
+            logging.warning(f"Could not check model version, serving cached version {entry[1]}: {e}")
+            self._checked_at = time.monotonic()
+            return entry[0]
+
+        if entry is not None and version == entry[1]:
+            logging.debug(f"Model version {version} unchanged, keeping resident model")
+            self._checked_at = time.monotonic()
+            return entry[0]
+
+        if version is None:
+            raise FileNotFoundError(f"Model {self.model_path} not found in bucket {self.bucket_name}")
+
+        try:
+            logging.info(f"Loading model version {version} into resident cache")
+            model = self._load_version(version)
+        except Exception as e:
+            raise MyException(e, sys)
+
+        self._entry = (model, version)
+        self._checked_at = time.monotonic()
+        logging.info(f"Resident model swapped to version {version}")
+        return model
+
+    def _load_version(self, version: str) -> MyModel:
+        """
+        Loads the given model version, from the local packed copy when one exists.
+        """
+        packed_dir = os.path.join(self.estimator.get_version_dir(version), MODEL_CACHE_PACKED_DIR_NAME)
+        if self.use_packed_model and is_packed_model(packed_dir):
+            logging.info(f"Memory-mapping packed model from {packed_dir}")
+            return load_packed_model(packed_dir)
+
+        model = self.estimator.load_model(version=version)
+
+        if not getattr(model, "feature_names", None):
+            # Resolve the feature schema once per model version instead of once per request
+            try:
+                model.feature_names = find_latest_artifact_feature_names()
+            except Exception as e:
+                logging.warning(f"Could not load feature names from local artifacts: {e}")
+
+        if self.use_packed_model:
+            try:
+                if pack_model(model, packed_dir):
+                    # Drop this process' private copy in favour of the shared mapping
+                    return load_packed_model(packed_dir)
+            except Exception as e:
+                logging.warning(f"Could not pack model version {version}, serving the unpickled model: {e}")
+        return model
+
+    def warm(self) -> None:
+        """
+        Loads the model eagerly, e.g. at worker startup.
+        """
+        self.get_model()
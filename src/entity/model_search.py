@@ -0,0 +1,135 @@
+import importlib
+import sys
+from typing import List, Tuple
+
+import numpy as np
+from sklearn.experimental import enable_halving_search_cv  # noqa: F401
+from sklearn.model_selection import HalvingGridSearchCV, HalvingRandomSearchCV, TimeSeriesSplit
+
+from src.exception import MyException
+from src.logger import logging
+from src.utils.main_utils import read_yaml_file
+
+
+SEARCH_METHODS = ("halving_random", "halving_grid", "none")
+
+
+class ModelSearch:
+    """
+    Hyperparameter search driven by the "model_selection" section of model.yaml.
+
+    Candidates are pruned with successive halving on row subsamples: each round fits the
+    remaining candidates on factor times more training rows and keeps the best 1/factor of
+    them, so most of the search budget goes to the few candidates that reach the full set.
+    Fits run in parallel across a joblib process pool and every trial is recorded.
+    """
+
+    def __init__(self, model_config: dict, search_config: dict = None):
+        """
+        :param model_config: {"module", "class", "params", "search_param_grid"}
+        :param search_config: {"method", "n_candidates", "factor", "min_resources", "cv", "scoring",
+                               "n_jobs", "random_state"}; None fits model_config["params"] as is
+        """
+        try:
+            self.model_config = model_config
+            # Cross-validated score of the selected candidate, set by fit when a search runs
+            self.best_score = None
+            self.search_config = dict(search_config or {"method": "none"})
+            if self.method not in SEARCH_METHODS:
+                raise ValueError(f"Unknown search method {self.method!r}, expected one of {SEARCH_METHODS}")
+        except Exception as e:
+            raise MyException(e, sys) from e
+
+    @classmethod
+    def from_yaml(cls, file_path: str) -> "ModelSearch":
+        """
+        Reads model.yaml; an empty file trains a default RandomForestRegressor without search.
+        """
+        try:
+            content = read_yaml_file(file_path) or {}
+            model_selection = content.get("model_selection") or {}
+            model_config = model_selection.get("model") or {
+                "module": "sklearn.ensemble", "class": "RandomForestRegressor", "params": {"random_state": 42}}
+            return cls(model_config=model_config, search_config=model_selection.get("search"))
+        except Exception as e:
+            raise MyException(e, sys) from e
+
+    @property
+    def method(self) -> str:
+        return self.search_config.get("method", "none")
+
+    def build_estimator(self):
+        """
+        Instantiates the configured estimator class with its fixed params.
+        """
+        module = importlib.import_module(self.model_config["module"])
+        estimator_cls = getattr(module, self.model_config["class"])
+        return estimator_cls(**(self.model_config.get("params") or {}))
+
+    def _build_search(self, n_rows: int):
+        config = self.search_config
+        param_grid = self.model_config.get("search_param_grid") or {}
+        # Rows are hourly and in time order: every candidate is scored on periods after the rows it was
+        # fitted on, as shuffled folds would let it interpolate between neighbouring hours
+        cv = TimeSeriesSplit(n_splits=config.get("cv", 3))
+        # Never start below one row per fold and never above the rows there are
+        min_resources = min(max(config.get("min_resources", 500), 2 * (cv.get_n_splits() + 1)), n_rows)
+        kwargs = dict(factor=config.get("factor", 3), resource="n_samples", min_resources=min_resources,
+                      cv=cv, scoring=config.get("scoring", "r2"), n_jobs=config.get("n_jobs", -1),
+                      random_state=config.get("random_state"), refit=False, error_score=np.nan)
+        if self.method == "halving_grid":
+            return HalvingGridSearchCV(self.build_estimator(), param_grid, **kwargs)
+        return HalvingRandomSearchCV(self.build_estimator(), param_grid,
+                                     n_candidates=config.get("n_candidates", "exhaust"), **kwargs)
+
+    def _fit_final(self, x: np.ndarray, y: np.ndarray, params: dict = None):
+        """
+        Fits the selected candidate on all of x. The search keeps the estimator single-threaded
+        because its own workers already fill the cores; this one fit runs alone, so it uses every
+        core, and the configured n_jobs is restored afterwards for prediction.
+        """
+        estimator = self.build_estimator().set_params(**(params or {}))
+        if "n_jobs" not in estimator.get_params():
+            return estimator.fit(x, y)
+        configured_n_jobs = estimator.get_params()["n_jobs"]
+        estimator.set_params(n_jobs=-1).fit(x, y)
+        return estimator.set_params(n_jobs=configured_n_jobs)
+
+    @staticmethod
+    def _trials(search) -> List[dict]:
+        results = search.cv_results_
+        trials = []
+        for index, params in enumerate(results["params"]):
+            trials.append({
+                "iteration": int(results["iter"][index]),
+                "n_resources": int(results["n_resources"][index]),
+                "params": {name: value.item() if isinstance(value, np.generic) else value
+                           for name, value in params.items()},
+                "mean_test_score": float(results["mean_test_score"][index]),
+                "std_test_score": float(results["std_test_score"][index]),
+                "mean_fit_time": float(results["mean_fit_time"][index]),
+            })
+        return trials
+
+    def fit(self, x: np.ndarray, y: np.ndarray) -> Tuple[object, List[dict]]:
+        """
+        Searches the configured space and refits the best candidate on all of x. The rows of x must
+        be in time order, since candidates are scored on the periods following their fit rows.
+
+        :return: (fitted estimator, trials) where trials lists every (candidate, round) scored
+        """
+        try:
+            if self.method == "none":
+                return self._fit_final(x, y), []
+
+            search = self._build_search(len(x))
+            logging.info(f"Running {self.method} search over {self.model_config['class']} "
+                         f"with factor={search.factor}, min_resources={search.min_resources}")
+            search.fit(x, y)
+            trials = self._trials(search)
+            self.best_score = float(search.best_score_)
+            logging.info(f"Search scored {len(trials)} trials in {search.n_iterations_} rounds, "
+                         f"best {search.scoring}={search.best_score_:.4f} with {search.best_params_}")
+            return self._fit_final(x, y, search.best_params_), trials
+        except Exception as e:
+            raise MyException(e, sys) from e
@@ -0,0 +1,177 @@
+import copy
+import os
+import shutil
+import sys
+from typing import Optional
+
+import numpy as np
+from sklearn.ensemble import ExtraTreesRegressor, RandomForestRegressor
+from sklearn.tree import DecisionTreeRegressor, ExtraTreeRegressor
+
+from src.entity.estimator import MyModel
+from src.exception import MyException
+from src.logger import logging
+from src.utils.main_utils import load_object, read_yaml_file, save_object, write_yaml_file
+
+
+PACKED_NODE_ARRAYS = ("children_left", "children_right", "feature", "threshold", "value", "roots")
+PACKED_META_FILE_NAME = "meta.yaml"
+PACKED_WRAPPER_FILE_NAME = "wrapper.pkl"
+PACKABLE_ESTIMATORS = (RandomForestRegressor, ExtraTreesRegressor, DecisionTreeRegressor, ExtraTreeRegressor)
+
+# Rows scored per traversal chunk, bounds the (rows x trees) node index matrix
+PREDICT_CHUNK_ROWS = 4096
+
+
+class PackedForestRegressor:
+    """
+    Tree-ensemble regressor evaluated from flat NumPy node arrays.
+
+    All trees are concatenated into one set of node arrays, with leaves pointing to
+    themselves, so every tree is traversed at once with a fixed number of vectorized steps.
+    Loaded with mmap_mode='r', the arrays live in the OS page cache and are shared by
+    every worker process that maps the same directory.
+    """
+
+    def __init__(self, arrays: dict, n_features_in_: int, max_depth: int):
+        """
+        :param arrays: Node arrays keyed by PACKED_NODE_ARRAYS
+        :param n_features_in_: Number of features the forest was trained on
+        :param max_depth: Depth of the deepest tree, i.e. traversal steps needed
+        """
+        self.children_left = arrays["children_left"]
+        self.children_right = arrays["children_right"]
+        self.feature = arrays["feature"]
+        self.threshold = arrays["threshold"]
+        self.value = arrays["value"]
+        self.roots = arrays["roots"]
+        self.n_features_in_ = n_features_in_
+        self.max_depth = max_depth
+
+    @staticmethod
+    def can_pack(estimator: object) -> bool:
+        """
+        True for single-output sklearn regression trees and forests of them.
+        """
+        return isinstance(estimator, PACKABLE_ESTIMATORS) and getattr(estimator, "n_outputs_", 1) == 1
+
+    @staticmethod
+    def save(estimator: object, directory: str) -> None:
+        """
+        Writes the estimator's node arrays as raw .npy files into directory.
+        The directory is written under a temporary name and renamed into place,
+        so concurrent workers never map a half-written model.
+        """
+        try:
+            trees = [tree.tree_ for tree in getattr(estimator, "estimators_", [estimator])]
+            node_counts = np.array([tree.node_count for tree in trees], dtype=np.int64)
+            roots = np.concatenate([[0], np.cumsum(node_counts)[:-1]]).astype(np.int32)
+
+            children_left, children_right, feature, threshold, value = [], [], [], [], []
+            for root, tree in zip(roots, trees):
+                node_ids = np.arange(tree.node_count, dtype=np.int32)
+                is_leaf = tree.children_left == -1
+                # Leaves loop back to themselves so extra traversal steps are no-ops
+                children_left.append(np.where(is_leaf, node_ids, tree.children_left) + root)
+                children_right.append(np.where(is_leaf, node_ids, tree.children_right) + root)
+                feature.append(np.where(is_leaf, 0, tree.feature))
+                threshold.append(tree.threshold)
+                value.append(tree.value[:, 0, 0])
+
+            arrays = {
+                "children_left": np.concatenate(children_left).astype(np.int32),
+                "children_right": np.concatenate(children_right).astype(np.int32),
+                "feature": np.concatenate(feature).astype(np.int32),
+                "threshold": np.concatenate(threshold).astype(np.float64),
+                "value": np.concatenate(value).astype(np.float64),
+                "roots": roots,
+            }
+            meta = {
+                "estimator": type(estimator).__name__,
+                "n_trees": len(trees),
+                "n_nodes": int(node_counts.sum()),
+                "n_features_in_": int(estimator.n_features_in_),
+                "max_depth": int(max(tree.max_depth for tree in trees)),
+            }
+
+            tmp_directory = f"{directory}.{os.getpid()}.tmp"
+            shutil.rmtree(tmp_directory, ignore_errors=True)
+            os.makedirs(tmp_directory)
+            for name, array in arrays.items():
+                np.save(os.path.join(tmp_directory, f"{name}.npy"), np.ascontiguousarray(array))
+            write_yaml_file(os.path.join(tmp_directory, PACKED_META_FILE_NAME), meta)
+
+            try:
+                os.rename(tmp_directory, directory)
+            except OSError:
+                # Another worker packed the same model version first
+                shutil.rmtree(tmp_directory, ignore_errors=True)
+            logging.info(f"Packed {meta['n_trees']} trees ({meta['n_nodes']} nodes) into {directory}")
+        except Exception as e:
+            raise MyException(e, sys) from e
+
+    @classmethod
+    def load(cls, directory: str, mmap_mode: Optional[str] = "r") -> "PackedForestRegressor":
+        try:
+            meta = read_yaml_file(os.path.join(directory, PACKED_META_FILE_NAME))
+            arrays = {name: np.load(os.path.join(directory, f"{name}.npy"), mmap_mode=mmap_mode)
+                      for name in PACKED_NODE_ARRAYS}
+            return cls(arrays=arrays, n_features_in_=meta["n_features_in_"], max_depth=meta["max_depth"])
+        except Exception as e:
+            raise MyException(e, sys) from e
+
+    def _predict_chunk(self, X: np.ndarray) -> np.ndarray:
+        rows = np.arange(X.shape[0])[:, None]
+        node = np.broadcast_to(self.roots, (X.shape[0], len(self.roots)))
+        for _ in range(self.max_depth):
+            go_left = X[rows, self.feature[node]] <= self.threshold[node]
+            node = np.where(go_left, self.children_left[node], self.children_right[node])
+        return self.value[node].mean(axis=1)
+
+    def predict(self, X) -> np.ndarray:
+        # sklearn compares float32 features against float64 thresholds; do the same
+        X = np.asarray(X, dtype=np.float32)
+        if X.shape[0] <= PREDICT_CHUNK_ROWS:
+            return self._predict_chunk(X)
+        return np.concatenate([self._predict_chunk(X[start:start + PREDICT_CHUNK_ROWS])
+                               for start in range(0, X.shape[0], PREDICT_CHUNK_ROWS)])
+
+    def __repr__(self):
+        return f"PackedForestRegressor(n_trees={len(self.roots)}, max_depth={self.max_depth})"
+
+
+def is_packed_model(directory: str) -> bool:
+    return os.path.exists(os.path.join(directory, PACKED_META_FILE_NAME)) and \
+        os.path.exists(os.path.join(directory, PACKED_WRAPPER_FILE_NAME))
+
+
+def pack_model(model: MyModel, directory: str) -> bool:
+    """
+    Stores model in the packed format: node arrays plus the MyModel wrapper without its estimator.
+    Returns False if the wrapped estimator cannot be packed.
+    """
+    if not PackedForestRegressor.can_pack(model.trained_model_object):
+        return False
+    try:
+        if not is_packed_model(directory):
+            PackedForestRegressor.save(model.trained_model_object, directory)
+            wrapper = copy.copy(model)
+            wrapper.trained_model_object = None
+            wrapper_file_path = os.path.join(directory, PACKED_WRAPPER_FILE_NAME)
+            save_object(f"{wrapper_file_path}.{os.getpid()}.tmp", wrapper)
+            os.replace(f"{wrapper_file_path}.{os.getpid()}.tmp", wrapper_file_path)
+        return True
+    except Exception as e:
+        raise MyException(e, sys) from e
+
+
+def load_packed_model(directory: str) -> MyModel:
+    """
+    Loads a packed model with its node arrays memory-mapped read-only.
+    """
+    try:
+        model = load_object(os.path.join(directory, PACKED_WRAPPER_FILE_NAME))
+        model.trained_model_object = PackedForestRegressor.load(directory)
+        return model
+    except Exception as e:
+        raise MyException(e, sys) from e
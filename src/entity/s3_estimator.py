@@ -1,7 +1,13 @@
 from src.cloud_storage.aws_storage import SimpleStorageService
+from src.cloud_storage.local_model_cache import LocalModelCache
+from src.constants import MODEL_CACHE_DIR
 from src.exception import MyException
 from src.entity.estimator import MyModel
+from src.logger import logging
+import os
+import pickle
 import sys
+from typing import Optional
 from pandas import DataFrame
 
 
@@ -10,15 +16,21 @@ class Proj1Estimator:
     This class is used to save and retrieve our model from s3 bucket and to do prediction
     """
 
-    def __init__(self,bucket_name,model_path,):
+    def __init__(self,bucket_name,model_path,cache_dir:str=MODEL_CACHE_DIR,use_local_cache:bool=True):
         """
         :param bucket_name: Name of your model bucket
         :param model_path: Location of your model in bucket
+        :param cache_dir: Local directory where downloaded model versions are kept
+        :param use_local_cache: Load the model through the local on-disk cache
         """
         self.bucket_name = bucket_name
         self.s3 = SimpleStorageService()
         self.model_path = model_path
         self.loaded_model:MyModel=None
+        self.use_local_cache = use_local_cache
+        self.local_cache = LocalModelCache(cache_dir=cache_dir)
+        # Result of the last HEAD request on model_path, so downloading that version needs no second one
+        self._last_head: Optional[dict] = None
 
 
     def is_model_present(self,model_path):
@@ -28,13 +40,90 @@ class Proj1Estimator:
             print(e)
             return False
 
-    def load_model(self,)->MyModel:
+    def load_model(self,version:str=None)->MyModel:
         """
-        Load the model from the model_path
+        Load the model from the model_path.
+        With the local cache enabled, the current version is looked up with a HEAD request
+        and only downloaded when it is not already on disk.
+        :param version: Model version (ETag) if already known, saves the HEAD request
         :return:
         """
+        try:
+            if not self.use_local_cache:
+                return self.s3.load_model(self.model_path,bucket_name=self.bucket_name)
+
+            model_file = self.get_model_file(version=version)
+            with open(model_file, "rb") as file_obj:
+                model = pickle.load(file_obj)
+            logging.info(f"Production model loaded from local cache file {model_file}.")
+            return model
+        except Exception as e:
+            raise MyException(e, sys)
+
+    def get_model_file(self,version:str=None)->str:
+        """
+        Returns the path of the model file in the local cache, downloading it first if this
+        version is not cached yet. Other processes can load the model from this path.
+        :param version: Model version (ETag) if already known, saves the HEAD request
+        """
+        try:
+            if version is None:
+                try:
+                    version = self.get_model_version()
+                except Exception as e:
+                    # S3 unreachable: fall back to the most recently used cached version
+                    version = self.local_cache.latest_version()
+                    if version is None:
+                        raise
+                    logging.warning(f"Could not check model version, using cached version {version}: {e}")
+            if version is None:
+                raise FileNotFoundError(f"Model {self.model_path} not found in bucket {self.bucket_name}")
+
+            file_name = os.path.basename(self.model_path)
+            model_file = self.local_cache.get_model_file(version, file_name)
+            if model_file is None:
+                head = self._last_head
+                if head is None or head["etag"] != version:
+                    head = self.get_model_head()
+                    if head is None or head["etag"] != version:
+                        raise FileNotFoundError(f"Model version {version} is no longer at {self.model_path} "
+                                                f"in bucket {self.bucket_name}")
+                encryption = head["server_side_encryption"]
+                model_file = self.local_cache.put_model_file(
+                    version, file_name,
+                    download_fn=lambda to_filename: self.s3.download_file(self.model_path, to_filename,
+                                                                          bucket_name=self.bucket_name),
+                    etag_is_md5=not (encryption or "").startswith("aws:kms"))
+            return model_file
+        except Exception as e:
+            raise MyException(e, sys)
 
-        return self.s3.load_model(self.model_path,bucket_name=self.bucket_name)
+    def get_version_dir(self, version: str) -> str:
+        """
+        Local cache directory of a model version, also used for derived files such as the packed model
+        """
+        return self.local_cache.version_dir(version)
+
+    def get_model_head(self) -> Optional[dict]:
+        """
+        Returns {"etag", "server_side_encryption"} of the model at model_path from one HEAD
+        request, or None if no model is present in the bucket.
+        """
+        try:
+            head = self.s3.head_object(bucket_name=self.bucket_name, s3_key=self.model_path)
+            if head is not None:
+                self._last_head = head
+            return head
+        except Exception as e:
+            raise MyException(e, sys)
+
+    def get_model_version(self) -> Optional[str]:
+        """
+        Returns the version identifier (S3 ETag) of the model at model_path
+        without downloading it. None if no model is present in the bucket.
+        """
+        head = self.get_model_head()
+        return head["etag"] if head is not None else None
 
     def save_model(self,from_file,remove:bool=False)->None:
         """
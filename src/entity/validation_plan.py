@@ -0,0 +1,243 @@
+import sys
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from src.exception import MyException
+
+
+# Invalid values kept per column as examples in the validation report
+MAX_INVALID_SAMPLES = 5
+
+
+class ColumnStats:
+    """
+    Mergeable per-column counters, so a column can be checked chunk by chunk and the
+    results combined without revisiting earlier chunks.
+    """
+
+    __slots__ = ("rows", "nulls", "type_errors", "below_min", "above_max", "invalid",
+                 "min", "max", "invalid_samples")
+
+    def __init__(self):
+        self.rows = 0
+        self.nulls = 0
+        self.type_errors = 0
+        self.below_min = 0
+        self.above_max = 0
+        self.invalid = 0
+        self.min = None
+        self.max = None
+        self.invalid_samples: List = []
+
+    def merge(self, other: "ColumnStats") -> "ColumnStats":
+        self.rows += other.rows
+        self.nulls += other.nulls
+        self.type_errors += other.type_errors
+        self.below_min += other.below_min
+        self.above_max += other.above_max
+        self.invalid += other.invalid
+        if other.min is not None:
+            self.min = other.min if self.min is None else min(self.min, other.min)
+        if other.max is not None:
+            self.max = other.max if self.max is None else max(self.max, other.max)
+        self.invalid_samples = (self.invalid_samples + other.invalid_samples)[:MAX_INVALID_SAMPLES]
+        return self
+
+    def _add_invalid_samples(self, values) -> None:
+        room = MAX_INVALID_SAMPLES - len(self.invalid_samples)
+        if room > 0:
+            self.invalid_samples.extend(str(value) for value in pd.unique(values)[:room])
+
+    def to_dict(self) -> dict:
+        return {
+            "rows": self.rows,
+            "nulls": self.nulls,
+            "null_ratio": round(self.nulls / self.rows, 6) if self.rows else 0.0,
+            "type_errors": self.type_errors,
+            "below_min": self.below_min,
+            "above_max": self.above_max,
+            "invalid": self.invalid,
+            "min": self.min,
+            "max": self.max,
+            "invalid_samples": self.invalid_samples,
+        }
+
+
+class ColumnCheck:
+    """
+    Compiled checks for one schema column: its kind, expected dtype and value constraints.
+    """
+
+    __slots__ = ("name", "kind", "dtype", "min", "max", "max_null_ratio", "allowed", "date_format")
+
+    def __init__(self, name: str, kind: str, dtype: str, min: Optional[float] = None, max: Optional[float] = None,
+                 max_null_ratio: float = 0.0, allowed: Optional[list] = None, format: Optional[str] = None):
+        """
+        :param kind: "numerical", "categorical" or "object"
+        :param dtype: schema dtype, "int" columns must also hold whole numbers
+        :param allowed: allowed categories of a categorical column
+        :param format: strptime format every value of an object column must parse with
+        """
+        self.name = name
+        self.kind = kind
+        self.dtype = dtype
+        self.min = min
+        self.max = max
+        self.max_null_ratio = max_null_ratio
+        self.allowed = None if allowed is None else pd.Index([str(value) for value in allowed])
+        self.date_format = format
+
+    def evaluate(self, series: pd.Series) -> ColumnStats:
+        stats = ColumnStats()
+        stats.rows = len(series)
+        is_null = series.isna().to_numpy()
+        stats.nulls = int(is_null.sum())
+        if self.kind == "numerical":
+            self._evaluate_numerical(series, is_null, stats)
+        elif self.allowed is not None:
+            self._evaluate_categories(series, is_null, stats)
+        elif self.date_format is not None:
+            self._evaluate_dates(series, is_null, stats)
+        return stats
+
+    def _evaluate_numerical(self, series: pd.Series, is_null: np.ndarray, stats: ColumnStats) -> None:
+        if pd.api.types.is_numeric_dtype(series.dtype) and not pd.api.types.is_bool_dtype(series.dtype):
+            values = series.to_numpy(dtype=np.float64, na_value=np.nan)
+        else:
+            values = pd.to_numeric(series, errors="coerce").to_numpy(dtype=np.float64, na_value=np.nan)
+            type_errors = np.isnan(values) & ~is_null
+            stats.type_errors = int(type_errors.sum())
+            if stats.type_errors:
+                stats._add_invalid_samples(series.to_numpy()[type_errors])
+
+        present = values[~np.isnan(values)]
+        if present.size == 0:
+            return
+        stats.min, stats.max = float(present.min()), float(present.max())
+        if self.dtype == "int":
+            fractional = present != np.floor(present)
+            stats.type_errors += int(fractional.sum())
+            if fractional.any():
+                stats._add_invalid_samples(present[fractional])
+        if self.min is not None:
+            below = present < self.min
+            stats.below_min = int(below.sum())
+            if stats.below_min:
+                stats._add_invalid_samples(present[below])
+        if self.max is not None:
+            above = present > self.max
+            stats.above_max = int(above.sum())
+            if stats.above_max:
+                stats._add_invalid_samples(present[above])
+
+    def _evaluate_categories(self, series: pd.Series, is_null: np.ndarray, stats: ColumnStats) -> None:
+        # Look up each distinct value once; rows are then checked through their integer codes
+        codes, uniques = pd.factorize(series)
+        unique_valid = pd.Index(uniques).astype(str).isin(self.allowed)
+        invalid = ~np.append(unique_valid, True)[codes] & ~is_null
+        stats.invalid = int(invalid.sum())
+        if stats.invalid:
+            stats._add_invalid_samples(series.to_numpy()[invalid])
+
+    def _evaluate_dates(self, series: pd.Series, is_null: np.ndarray, stats: ColumnStats) -> None:
+        codes, uniques = pd.factorize(series)
+        parsed = pd.to_datetime(pd.Series(uniques, dtype=object), format=self.date_format, errors="coerce")
+        unique_valid = parsed.notna().to_numpy()
+        invalid = ~np.append(unique_valid, True)[codes] & ~is_null
+        stats.type_errors = int(invalid.sum())
+        if stats.type_errors:
+            stats._add_invalid_samples(series.to_numpy()[invalid])
+
+    def failures(self, stats: ColumnStats) -> List[str]:
+        """
+        Human readable constraint violations of the accumulated stats, empty if the column is valid.
+        """
+        failures = []
+        null_ratio = stats.nulls / stats.rows if stats.rows else 0.0
+        if null_ratio > self.max_null_ratio:
+            failures.append(f"null ratio {null_ratio:.6g} above {self.max_null_ratio}")
+        if stats.type_errors and self.date_format is not None:
+            failures.append(f"{stats.type_errors} values not matching date format {self.date_format}")
+        elif stats.type_errors:
+            failures.append(f"{stats.type_errors} values not of type {self.dtype}")
+        if stats.below_min:
+            failures.append(f"{stats.below_min} values below {self.min}")
+        if stats.above_max:
+            failures.append(f"{stats.above_max} values above {self.max}")
+        if stats.invalid:
+            failures.append(f"{stats.invalid} values outside {list(self.allowed)}")
+        return failures
+
+
+class ValidationPlan:
+    """
+    Column checks compiled once from schema.yaml and evaluated a whole column at a time
+    with vectorized operations. A plan can run on a full DataFrame or on streamed batches,
+    whose per-column stats are merged into the same result.
+    """
+
+    def __init__(self, checks: List[ColumnCheck]):
+        self.checks = checks
+
+    @classmethod
+    def from_schema(cls, schema_config: dict, default_max_null_ratio: float = 0.0) -> "ValidationPlan":
+        """
+        Builds the plan from the schema's column lists, dtypes and "constraints" section.
+        """
+        try:
+            dtypes = {}
+            for column in schema_config.get("columns", []):
+                dtypes.update(column)
+            constraints = schema_config.get("constraints") or {}
+
+            checks = []
+            for kind, key in (("numerical", "numerical_columns"), ("categorical", "categorical_columns"),
+                              ("object", "object_columns")):
+                for name in schema_config.get(key, []):
+                    constraint = dict(constraints.get(name) or {})
+                    constraint.setdefault("max_null_ratio", default_max_null_ratio)
+                    dtype = dtypes.get(name, "float" if kind == "numerical" else kind)
+                    checks.append(ColumnCheck(name=name, kind=kind, dtype=dtype, **constraint))
+            return cls(checks)
+        except Exception as e:
+            raise MyException(e, sys) from e
+
+    def evaluate(self, dataframe: pd.DataFrame, stats: Dict[str, ColumnStats] = None) -> Dict[str, ColumnStats]:
+        """
+        Evaluates one DataFrame or batch and merges the result into stats, if given.
+        Columns missing from the DataFrame are skipped; the column checks report those.
+        """
+        stats = {} if stats is None else stats
+        for check in self.checks:
+            if check.name not in dataframe.columns:
+                continue
+            chunk_stats = check.evaluate(dataframe[check.name])
+            if check.name in stats:
+                stats[check.name].merge(chunk_stats)
+            else:
+                stats[check.name] = chunk_stats
+        return stats
+
+    def evaluate_batches(self, batches: Iterable[pd.DataFrame]) -> Dict[str, ColumnStats]:
+        stats = {}
+        for batch in batches:
+            self.evaluate(batch, stats)
+        return stats
+
+    def report(self, stats: Dict[str, ColumnStats]) -> dict:
+        """
+        Returns {"status", "failures": {column: [messages]}, "columns": {column: stats}}.
+        """
+        failures = {}
+        for check in self.checks:
+            if check.name in stats:
+                column_failures = check.failures(stats[check.name])
+                if column_failures:
+                    failures[check.name] = column_failures
+        return {
+            "status": len(failures) == 0,
+            "failures": failures,
+            "columns": {name: column_stats.to_dict() for name, column_stats in stats.items()},
+        }
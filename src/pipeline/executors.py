@@ -0,0 +1,57 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+from src.constants import PREDICTION_EXECUTOR_MAX_WORKERS, TRAINING_EXECUTOR_MAX_WORKERS
+from src.logger import logging
+
+
+# Blocking work (boto3 I/O, unpickling, sklearn inference, training job submission) runs on these pools
+# so the asyncio event loop only parses requests and writes responses.
+# Inference uses threads so every worker thread shares the process-resident model;
+# tree ensembles release the GIL while traversing, so the threads run in parallel.
+_prediction_executor: Optional[ThreadPoolExecutor] = None
+_training_executor: Optional[ThreadPoolExecutor] = None
+_lock = threading.Lock()
+
+
+def get_prediction_executor() -> ThreadPoolExecutor:
+    """
+    Returns the bounded pool used for model loading and inference.
+    """
+    global _prediction_executor
+    if _prediction_executor is None:
+        with _lock:
+            if _prediction_executor is None:
+                _prediction_executor = ThreadPoolExecutor(max_workers=PREDICTION_EXECUTOR_MAX_WORKERS,
+                                                          thread_name_prefix="prediction")
+    return _prediction_executor
+
+
+def get_training_executor() -> ThreadPoolExecutor:
+    """
+    Returns the background pool that submits training jobs (a file lock shared with the other
+    workers plus a process spawn), kept separate so a slow submission never occupies inference threads.
+    """
+    global _training_executor
+    if _training_executor is None:
+        with _lock:
+            if _training_executor is None:
+                _training_executor = ThreadPoolExecutor(max_workers=TRAINING_EXECUTOR_MAX_WORKERS,
+                                                        thread_name_prefix="training")
+    return _training_executor
+
+
+def shutdown_executors() -> None:
+    """
+    Stops accepting new work on both pools. Running tasks are not interrupted.
+    Callers must look the pools up again through the getters, which create new ones.
+    """
+    global _prediction_executor, _training_executor
+    with _lock:
+        for executor in (_prediction_executor, _training_executor):
+            if executor is not None:
+                executor.shutdown(wait=False)
+        _prediction_executor = None
+        _training_executor = None
+    logging.info("Prediction and training executors shut down")
@@ -1,13 +1,18 @@
 import sys
 from src.entity.config_entity import VehiclePredictorConfig
-from src.entity.s3_estimator import Proj1Estimator
+from src.entity.model_cache import ResidentModelCache
+from src.entity.feature_vector import FEATURE_COLUMNS
 from src.exception import MyException
 from src.logger import logging
+import numpy as np
+import pandas as pd
 from pandas import DataFrame
-import os
-import glob
-from src.utils.main_utils import read_yaml_file
-from src.constants import TARGET_COLUMN
+from src.constants import PREDICTION_BATCH_MAX_ROWS
+
+
+# Engineered input columns accepted by the prediction pipeline; the model's fitted
+# feature transformer maps them onto its trained features
+VEHICLE_INPUT_COLUMNS = list(FEATURE_COLUMNS)
 
 
 
@@ -115,6 +120,61 @@ class VehicleData:
             raise MyException(e, sys) from e
 
 
+class VehicleBatchData:
+    def __init__(self, dataframe: DataFrame):
+        """
+        Batch of feature rows for vectorized prediction
+        Input: DataFrame with one row per prediction and VEHICLE_INPUT_COLUMNS as columns
+        """
+        self.dataframe = dataframe
+
+    @classmethod
+    def from_payload(cls, payload) -> "VehicleBatchData":
+        """
+        Builds a batch from a decoded JSON payload. Accepted shapes:
+            - a JSON array of row objects: [{"Hour": 8, ...}, ...]
+            - {"instances": [{"Hour": 8, ...}, ...]}
+            - {"columns": {"Hour": [8, 9, ...], ...}} or the columnar mapping itself
+        Every row must provide every feature in VEHICLE_INPUT_COLUMNS with a numeric, non-null value;
+        payloads with missing, unknown or null features are rejected rather than zero-filled.
+        """
+        try:
+            if isinstance(payload, dict) and "instances" in payload:
+                payload = payload["instances"]
+            elif isinstance(payload, dict) and "columns" in payload:
+                payload = payload["columns"]
+
+            if isinstance(payload, list):
+                dataframe = DataFrame.from_records(payload)
+            elif isinstance(payload, dict):
+                dataframe = DataFrame(payload)
+            else:
+                raise ValueError("Batch payload must be a list of rows or a mapping of columns")
+
+            if len(dataframe) == 0:
+                raise ValueError("Batch payload contains no rows")
+            if len(dataframe) > PREDICTION_BATCH_MAX_ROWS:
+                raise ValueError(f"Batch payload has {len(dataframe)} rows, limit is {PREDICTION_BATCH_MAX_ROWS}")
+
+            missing_columns = [col for col in VEHICLE_INPUT_COLUMNS if col not in dataframe.columns]
+            unknown_columns = [col for col in dataframe.columns if col not in VEHICLE_INPUT_COLUMNS]
+            if missing_columns or unknown_columns:
+                raise ValueError(f"Batch payload columns do not match the model inputs: "
+                                 f"missing {missing_columns}, unknown {unknown_columns}")
+
+            dataframe = dataframe[VEHICLE_INPUT_COLUMNS].apply(pd.to_numeric, errors="raise")
+            null_counts = dataframe.isna().sum()
+            null_columns = null_counts[null_counts > 0]
+            if len(null_columns):
+                raise ValueError(f"Batch payload has null values: {null_columns.to_dict()}")
+            return cls(dataframe=dataframe)
+        except Exception as e:
+            raise MyException(e, sys) from e
+
+    def get_vehicle_input_data_frame(self) -> DataFrame:
+        return self.dataframe
+
+
 class VehicleDataClassifier:
     def __init__(self,prediction_pipeline_config: VehiclePredictorConfig = VehiclePredictorConfig(),) -> None:
         """
@@ -122,6 +182,13 @@ class VehicleDataClassifier:
         """
         try:
             self.prediction_pipeline_config = prediction_pipeline_config
+            self.model_cache = ResidentModelCache.get_instance(
+                bucket_name=self.prediction_pipeline_config.model_bucket_name,
+                model_path=self.prediction_pipeline_config.model_file_path,
+                ttl_seconds=self.prediction_pipeline_config.model_cache_ttl_seconds,
+                cache_dir=self.prediction_pipeline_config.model_cache_dir,
+                use_packed_model=self.prediction_pipeline_config.use_packed_model,
+            )
         except Exception as e:
             raise MyException(e, sys)
 
@@ -133,43 +200,7 @@ class VehicleDataClassifier:
         """
         try:
             logging.info("Entered predict method of VehicleDataClassifier class")
-            model = Proj1Estimator(
-                bucket_name=self.prediction_pipeline_config.model_bucket_name,
-                model_path=self.prediction_pipeline_config.model_file_path,
-            )
-
-            # Attempt to find transformed feature names from the latest artifact so
-            # we can reorder/select the incoming DataFrame columns to match training.
-            try:
-                artifact_dirs = glob.glob(os.path.join("artifact", "*"))
-                artifact_dirs = [d for d in artifact_dirs if os.path.isdir(d)]
-                artifact_dirs.sort(key=lambda x: os.path.getmtime(x), reverse=True)
-                feature_names = None
-                for d in artifact_dirs:
-                    candidate = os.path.join(d, "data_transformation", "transformed", "feature_names.yaml")
-                    if os.path.exists(candidate):
-                        feature_names = read_yaml_file(candidate)
-                        break
-
-                if feature_names:
-                    # feature_names saved include the TARGET_COLUMN as last entry; remove it
-                    if feature_names and feature_names[-1] == TARGET_COLUMN:
-                        expected_features = feature_names[:-1]
-                    else:
-                        expected_features = feature_names
-
-                    # Build ordered DataFrame matching expected_features, pad missing with zeros
-                    import pandas as _pd
-                    ordered = _pd.DataFrame()
-                    for feat in expected_features:
-                        if feat in dataframe.columns:
-                            ordered[feat] = dataframe[feat]
-                        else:
-                            ordered[feat] = 0
-                    dataframe = ordered
-                    logging.info(f"Reordered/padded input to match {len(expected_features)} training features")
-            except Exception:
-                logging.warning("Could not find or load feature_names.yaml — falling back to given dataframe")
+            model = self.model_cache.get_model()
 
             result = model.predict(dataframe)
             return result
@@ -178,4 +209,13 @@ class VehicleDataClassifier:
             raise MyException(e, sys)
 
 
-
+    def predict_array(self, features, columns) -> np.ndarray:
+        """
+        Predicts on a 2-D float array whose columns are named by columns
+        (e.g. stacked BikeFeatureVector rows), skipping DataFrame construction.
+        """
+        try:
+            model = self.model_cache.get_model()
+            return model.predict_array(features, tuple(columns))
+        except Exception as e:
+            raise MyException(e, sys)
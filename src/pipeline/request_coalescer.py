@@ -0,0 +1,150 @@
+import asyncio
+import sys
+from concurrent.futures import Executor
+from typing import Callable, List, Optional, Set, Tuple, Union
+
+import numpy as np
+import pandas as pd
+from pandas import DataFrame
+
+from src.constants import (PREDICTION_COALESCE_MAX_BATCH_SIZE, PREDICTION_COALESCE_WINDOW_MS,
+                           PREDICTION_EXECUTOR_MAX_WORKERS)
+from src.exception import MyException
+from src.logger import logging
+
+
+class PredictionCoalescer:
+    """
+    Collects concurrent prediction requests arriving within a short window and scores
+    them with a single batched predict call, then hands each caller its own rows back.
+
+    A batch is flushed as soon as max_batch_size rows are queued or window_ms has
+    elapsed since the first queued request, whichever comes first. Batches are scored
+    on executor, so the event loop keeps collecting the next batch meanwhile. At most
+    max_in_flight batches are scored or waiting for the executor at once; beyond that the
+    collector waits, so an overloaded server does not pile up batches in memory.
+    """
+
+    def __init__(self, predict_fn: Callable[[Union[DataFrame, np.ndarray]], object],
+                 window_ms: float = PREDICTION_COALESCE_WINDOW_MS,
+                 max_batch_size: int = PREDICTION_COALESCE_MAX_BATCH_SIZE,
+                 executor: Union[Executor, Callable[[], Executor], None] = None,
+                 max_in_flight: int = PREDICTION_EXECUTOR_MAX_WORKERS):
+        """
+        :param predict_fn: Function scoring a DataFrame or 2-D array and returning one prediction per row
+        :param window_ms: Maximum time the first request of a batch waits for company
+        :param max_batch_size: Maximum number of rows scored in one predict call
+        :param executor: Executor running predict_fn, or a function returning the current one
+                         (looked up per batch, so a recreated pool is picked up); the loop's default executor if None
+        :param max_in_flight: Maximum number of batches submitted to the executor and not finished yet
+        """
+        self.predict_fn = predict_fn
+        self.window_seconds = window_ms / 1000.0
+        self.max_batch_size = max_batch_size
+        self.executor = executor
+        self.max_in_flight = max_in_flight
+        self._flush_slots: Optional[asyncio.Semaphore] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._flushes: Set[asyncio.Task] = set()
+
+    async def start(self) -> None:
+        """
+        Starts the background batching task on the running event loop.
+        """
+        if self._worker is None or self._worker.done():
+            self._queue = asyncio.Queue()
+            self._flush_slots = asyncio.Semaphore(self.max_in_flight)
+            self._worker = asyncio.get_running_loop().create_task(self._run())
+            logging.info(f"Prediction coalescer started (window={self.window_seconds * 1000:.1f}ms, "
+                         f"max_batch_size={self.max_batch_size})")
+
+    async def stop(self) -> None:
+        """
+        Cancels the batching task and fails any request still waiting in the queue.
+        """
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+        while self._queue is not None and not self._queue.empty():
+            _, future = self._queue.get_nowait()
+            if not future.done():
+                future.set_exception(RuntimeError("Prediction coalescer stopped"))
+
+    async def submit(self, dataframe: Union[DataFrame, np.ndarray]):
+        """
+        Queues the rows of dataframe (a DataFrame or 2-D array, not mixed within one
+        coalescer) for the next batch and waits for their predictions.
+        Returns the predictions for these rows only, in order.
+        """
+        if self._worker is None or self._worker.done():
+            await self.start()
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((dataframe, future))
+        return await future
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            n_rows = len(batch[0][0])
+            deadline = loop.time() + self.window_seconds
+
+            while n_rows < self.max_batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), timeout=timeout)
+                except asyncio.TimeoutError:
+                    break
+                batch.append(item)
+                n_rows += len(item[0])
+
+            # Score in the background, but wait for a free slot first so pending batches stay bounded
+            await self._flush_slots.acquire()
+            flush = loop.create_task(self._flush(batch))
+            self._flushes.add(flush)
+            flush.add_done_callback(self._flush_done)
+
+    def _flush_done(self, flush: asyncio.Task) -> None:
+        self._flushes.discard(flush)
+        self._flush_slots.release()
+
+    def _get_executor(self) -> Optional[Executor]:
+        return self.executor() if callable(self.executor) else self.executor
+
+    async def _flush(self, batch: List[Tuple[Union[DataFrame, np.ndarray], asyncio.Future]]) -> None:
+        # Callers that gave up (e.g. client disconnected) do not need scoring
+        batch = [(dataframe, future) for dataframe, future in batch if not future.done()]
+        if not batch:
+            return
+
+        try:
+            frames = [dataframe for dataframe, _ in batch]
+            if len(frames) == 1:
+                combined = frames[0]
+            elif isinstance(frames[0], DataFrame):
+                combined = pd.concat(frames, ignore_index=True)
+            else:
+                combined = np.concatenate(frames, axis=0)
+            logging.debug(f"Scoring coalesced batch of {len(combined)} rows from {len(batch)} requests")
+            loop = asyncio.get_running_loop()
+            predictions = await loop.run_in_executor(self._get_executor(), self.predict_fn, combined)
+        except Exception as e:
+            error = e if isinstance(e, MyException) else MyException(e, sys)
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(error)
+            return
+
+        offset = 0
+        for dataframe, future in batch:
+            n_rows = len(dataframe)
+            if not future.done():
+                future.set_result(predictions[offset:offset + n_rows])
+            offset += n_rows
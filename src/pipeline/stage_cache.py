@@ -0,0 +1,163 @@
+import dataclasses
+import hashlib
+import inspect
+import json
+import os
+import sys
+import time
+from typing import Optional, Tuple
+
+import pandas as pd
+
+from src.constants import TRAINING_PIPELINE_STAGE_CACHE_DIR
+from src.exception import MyException
+from src.logger import logging
+
+
+# Bump to invalidate every cached stage, e.g. when the artifact layout changes
+STAGE_CACHE_VERSION = 2
+_HASH_CHUNK_SIZE = 1 << 20
+
+
+def fingerprint(*parts) -> str:
+    """
+    Stable hash of JSON-serializable parts (strings, numbers, lists, dicts).
+    """
+    payload = json.dumps([STAGE_CACHE_VERSION, *parts], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def hash_file(file_path: str) -> Optional[str]:
+    """
+    Content hash of a file, None if it does not exist.
+    """
+    if not os.path.exists(file_path):
+        return None
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as file_obj:
+        for chunk in iter(lambda: file_obj.read(_HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def hash_source(obj: object) -> str:
+    """
+    Hash of the source file defining obj, used as the code version of a pipeline component.
+    """
+    return hash_file(inspect.getsourcefile(obj))
+
+
+def hash_dataframe(dataframe: pd.DataFrame) -> str:
+    """
+    Content hash of a DataFrame's columns, dtypes and values.
+    """
+    digest = hashlib.sha256()
+    digest.update(json.dumps([str(column) for column in dataframe.columns]).encode())
+    digest.update(json.dumps([str(dtype) for dtype in dataframe.dtypes]).encode())
+    digest.update(pd.util.hash_pandas_object(dataframe, index=False).values.tobytes())
+    return digest.hexdigest()
+
+
+def config_params(config: object) -> dict:
+    """
+    The settings of a config object that influence a stage's output. Artifact locations
+    (*_dir, *_path) are left out since every run writes into a new timestamped directory.
+    """
+    params = {}
+    for name in dir(config):
+        if name.startswith("__") or name.endswith("_dir") or name.endswith("_path"):
+            continue
+        value = getattr(config, name)
+        if value is None or isinstance(value, (str, int, float, bool, list, tuple, dict)):
+            params[name] = value
+    return params
+
+
+class StageCache:
+    """
+    Remembers the artifact each pipeline stage produced for a given input fingerprint,
+    so an unchanged stage can reuse the files of an earlier run instead of recomputing them.
+
+    Entries are stored as <cache_dir>/<stage>/<fingerprint>.json with the artifact's
+    file paths and plain fields; in-memory artifact fields are never stored. The content hash
+    of every artifact file is stored too, since a later run in the same process reuses the same
+    timestamped paths and may have overwritten them.
+    """
+
+    def __init__(self, cache_dir: str = TRAINING_PIPELINE_STAGE_CACHE_DIR):
+        self.cache_dir = cache_dir
+
+    def _entry_file_path(self, stage: str, input_fingerprint: str) -> str:
+        return os.path.join(self.cache_dir, stage, f"{input_fingerprint}.json")
+
+    @staticmethod
+    def _artifact_to_dict(artifact) -> dict:
+        data = {}
+        for field in dataclasses.fields(artifact):
+            if field.metadata.get("in_memory"):
+                continue
+            value = getattr(artifact, field.name)
+            data[field.name] = dataclasses.asdict(value) if dataclasses.is_dataclass(value) else value
+        return data
+
+    @staticmethod
+    def _artifact_from_dict(artifact_cls, data: dict):
+        kwargs = {}
+        for field in dataclasses.fields(artifact_cls):
+            if field.name not in data:
+                continue
+            value = data[field.name]
+            if dataclasses.is_dataclass(field.type) and isinstance(value, dict):
+                value = field.type(**value)
+            kwargs[field.name] = value
+        return artifact_cls(**kwargs)
+
+    @staticmethod
+    def _file_hashes(data: dict) -> dict:
+        return {name: hash_file(value) for name, value in data.items()
+                if name.endswith("_path") and isinstance(value, str)}
+
+    def lookup(self, stage: str, input_fingerprint: str, artifact_cls) -> Optional[Tuple[object, str]]:
+        """
+        Returns (artifact, output_fingerprint) recorded for input_fingerprint, or None if there is
+        no entry or any of its artifact files is gone or changed.
+        """
+        entry_file_path = self._entry_file_path(stage, input_fingerprint)
+        if not os.path.exists(entry_file_path):
+            return None
+        try:
+            with open(entry_file_path, "r") as entry_file:
+                entry = json.load(entry_file)
+            file_hashes = self._file_hashes(entry["artifact"])
+            if None in file_hashes.values() or file_hashes != entry["file_hashes"]:
+                logging.info(f"Cached {stage} artifact files are missing or were overwritten")
+                return None
+            return self._artifact_from_dict(artifact_cls, entry["artifact"]), entry["output_fingerprint"]
+        except Exception as e:
+            # A corrupt or outdated entry only means the stage runs again
+            logging.warning(f"Ignoring stage cache entry {entry_file_path}: {e}")
+            return None
+
+    def record(self, stage: str, input_fingerprint: str, artifact, output_fingerprint: str = None) -> None:
+        """
+        Stores the artifact produced for input_fingerprint. Call only once the artifact's
+        files are completely written.
+        """
+        try:
+            artifact_data = self._artifact_to_dict(artifact)
+            entry = {
+                "stage": stage,
+                "input_fingerprint": input_fingerprint,
+                "output_fingerprint": output_fingerprint or input_fingerprint,
+                "created_at": time.time(),
+                "artifact": artifact_data,
+                "file_hashes": self._file_hashes(artifact_data),
+            }
+            entry_file_path = self._entry_file_path(stage, input_fingerprint)
+            os.makedirs(os.path.dirname(entry_file_path), exist_ok=True)
+            tmp_file_path = f"{entry_file_path}.{os.getpid()}.tmp"
+            with open(tmp_file_path, "w") as entry_file:
+                json.dump(entry, entry_file, indent=4)
+            os.replace(tmp_file_path, entry_file_path)
+        except Exception as e:
+            raise MyException(e, sys) from e
@@ -0,0 +1,225 @@
+import fcntl
+import json
+import multiprocessing
+import os
+import sys
+import time
+import uuid
+from datetime import datetime
+from typing import List, Optional
+
+from src.constants import TRAINING_JOBS_DIR, TRAINING_JOBS_MAX_CONCURRENT
+from src.exception import MyException
+from src.logger import logging
+from src.pipeline.training_pipeline import TRAINING_PIPELINE_STAGES, TrainPipeline
+
+
+ACTIVE_JOB_STATUSES = ("queued", "running")
+# A queued job started by another worker has this long to report its pid before it is considered lost
+QUEUED_JOB_GRACE_SECONDS = 300
+# Held exclusively while a worker checks the running jobs and registers a new one
+SUBMIT_LOCK_FILE_NAME = "submit.lock"
+
+
+def _now() -> str:
+    return datetime.now().isoformat(timespec="seconds")
+
+
+class TrainingJobStore:
+    """
+    Keeps one JSON status file per training job. Files are replaced atomically, so the
+    serving workers can read a job's status while the training process is updating it.
+    """
+
+    def __init__(self, jobs_dir: str = TRAINING_JOBS_DIR):
+        self.jobs_dir = jobs_dir
+
+    def _job_file_path(self, job_id: str) -> str:
+        return os.path.join(self.jobs_dir, f"{job_id}.json")
+
+    def write(self, job: dict) -> None:
+        try:
+            os.makedirs(self.jobs_dir, exist_ok=True)
+            file_path = self._job_file_path(job["job_id"])
+            tmp_file_path = f"{file_path}.{os.getpid()}.tmp"
+            with open(tmp_file_path, "w") as job_file:
+                json.dump(job, job_file, indent=4)
+            os.replace(tmp_file_path, file_path)
+        except Exception as e:
+            raise MyException(e, sys) from e
+
+    def read(self, job_id: str) -> Optional[dict]:
+        # Job ids are generated by us; anything else must not be used to build a path
+        if not job_id or not all(c.isalnum() for c in job_id):
+            return None
+        file_path = self._job_file_path(job_id)
+        if not os.path.exists(file_path):
+            return None
+        try:
+            with open(file_path, "r") as job_file:
+                return json.load(job_file)
+        except Exception as e:
+            raise MyException(e, sys) from e
+
+    def list_jobs(self) -> List[dict]:
+        if not os.path.isdir(self.jobs_dir):
+            return []
+        jobs = []
+        for file_name in os.listdir(self.jobs_dir):
+            if file_name.endswith(".json"):
+                job = self.read(file_name[:-len(".json")])
+                if job is not None:
+                    jobs.append(job)
+        return jobs
+
+
+class TrainingJobTracker:
+    """
+    Stage callback for TrainPipeline that records per-stage status and timings to the job store.
+    """
+
+    def __init__(self, store: TrainingJobStore, job: dict):
+        self.store = store
+        self.job = job
+        self._stage_started = {}
+
+    def __call__(self, stage: str, status: str, error: str = None) -> None:
+        stage_status = self.job["stages"][stage]
+        stage_status["status"] = status
+        if status == "running":
+            self._stage_started[stage] = time.monotonic()
+            stage_status["started_at"] = _now()
+        elif stage in self._stage_started:
+            stage_status["finished_at"] = _now()
+            stage_status["duration_seconds"] = round(time.monotonic() - self._stage_started[stage], 3)
+        if error is not None:
+            stage_status["error"] = error
+        self.store.write(self.job)
+
+
+def _run_training_job(job_id: str, jobs_dir: str) -> None:
+    """
+    Entry point of the training process: runs the whole pipeline and records its outcome.
+    """
+    store = TrainingJobStore(jobs_dir)
+    job = store.read(job_id)
+    job["status"] = "running"
+    job["pid"] = os.getpid()
+    job["started_at"] = _now()
+    store.write(job)
+
+    started = time.monotonic()
+    try:
+        TrainPipeline(stage_callback=TrainingJobTracker(store, job)).run_pipeline()
+        job["status"] = "completed"
+    except Exception as e:
+        logging.error(f"Training job {job_id} failed: {e}")
+        job["status"] = "failed"
+        job["error"] = str(e)
+    finally:
+        job["finished_at"] = _now()
+        job["duration_seconds"] = round(time.monotonic() - started, 3)
+        store.write(job)
+
+
+class TrainingJobManager:
+    """
+    Launches training pipeline runs in separate processes and reports their status.
+    """
+
+    def __init__(self, jobs_dir: str = TRAINING_JOBS_DIR, max_concurrent_jobs: int = TRAINING_JOBS_MAX_CONCURRENT):
+        self.store = TrainingJobStore(jobs_dir)
+        self.max_concurrent_jobs = max_concurrent_jobs
+        # spawn gives the job a fresh interpreter, so it does not inherit the server's threads or event loop
+        self._context = multiprocessing.get_context("spawn")
+        self._processes = {}
+
+    def _is_job_alive(self, job: dict) -> bool:
+        process = self._processes.get(job["job_id"])
+        if process is not None:
+            return process.is_alive()
+        if job.get("pid"):
+            try:
+                os.kill(job["pid"], 0)
+                return True
+            except OSError:
+                return False
+        queued_for = datetime.now() - datetime.fromisoformat(job["submitted_at"])
+        return queued_for.total_seconds() < QUEUED_JOB_GRACE_SECONDS
+
+    def get_active_jobs(self) -> List[dict]:
+        """
+        Returns jobs that are queued or running. Jobs whose process died without
+        recording an outcome are marked as failed.
+        """
+        # Reap finished children started from this process
+        multiprocessing.active_children()
+        self._processes = {job_id: process for job_id, process in self._processes.items() if process.is_alive()}
+        active_jobs = []
+        for job in self.store.list_jobs():
+            if job["status"] not in ACTIVE_JOB_STATUSES:
+                continue
+            if self._is_job_alive(job):
+                active_jobs.append(job)
+            else:
+                job["status"] = "failed"
+                job["error"] = "Training process exited unexpectedly"
+                job["finished_at"] = _now()
+                self.store.write(job)
+        return active_jobs
+
+    def submit(self) -> dict:
+        """
+        Starts a new training job in a separate process and returns its initial status.
+        Raises RuntimeError if max_concurrent_jobs are already running.
+
+        The check and the registration of the new job happen under an exclusive file lock in
+        jobs_dir, so serving workers submitting at the same moment cannot both pass the check.
+        """
+        os.makedirs(self.store.jobs_dir, exist_ok=True)
+        with open(os.path.join(self.store.jobs_dir, SUBMIT_LOCK_FILE_NAME), "w") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                return self._submit_locked()
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _submit_locked(self) -> dict:
+        active_jobs = self.get_active_jobs()
+        if len(active_jobs) >= self.max_concurrent_jobs:
+            raise RuntimeError(f"Training job {active_jobs[0]['job_id']} is already running")
+
+        job_id = uuid.uuid4().hex
+        job = {
+            "job_id": job_id,
+            "status": "queued",
+            "pid": None,
+            "submitted_at": _now(),
+            "started_at": None,
+            "finished_at": None,
+            "duration_seconds": None,
+            "error": None,
+            "stages": {
+                stage: {"status": "pending", "started_at": None, "finished_at": None,
+                        "duration_seconds": None, "error": None}
+                for stage in TRAINING_PIPELINE_STAGES
+            },
+        }
+        self.store.write(job)
+
+        try:
+            process = self._context.Process(target=_run_training_job, args=(job_id, self.store.jobs_dir),
+                                            name=f"training-{job_id}")
+            process.start()
+        except Exception as e:
+            job["status"] = "failed"
+            job["error"] = str(e)
+            self.store.write(job)
+            raise MyException(e, sys) from e
+
+        self._processes[job_id] = process
+        logging.info(f"Started training job {job_id} in process {process.pid}")
+        return job
+
+    def get_status(self, job_id: str) -> Optional[dict]:
+        return self.store.read(job_id)
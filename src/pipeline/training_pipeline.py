@@ -1,6 +1,16 @@
 import sys
+from typing import Callable, Optional, Tuple
 from src.exception import MyException
 from src.logger import logging
+from src.constants import (TRAINING_PIPELINE_IN_MEMORY, TRAINING_PIPELINE_STAGE_CACHE,
+                           SCHEMA_FILE_PATH, DEFAULT_CATALOG, DEFAULT_SCHEMA, DEFAULT_TABLE)
+from src.utils.artifact_writer import ArtifactWriter, write_artifact
+from src.pipeline.stage_cache import StageCache, fingerprint, hash_file, hash_source, hash_dataframe, config_params
+from src.entity.estimator import MyModel
+from src.entity.model_search import ModelSearch
+from src.entity.drift_profile import DriftProfile
+from src.entity.feature_transformer import BikeFeatureTransformer
+from src.utils.date_features import DateFeatureExtractor
 
 
 from src.components.data_ingestion import DataIngestion
@@ -34,8 +44,27 @@ from src.entity.artifact_entity import (DataIngestionArtifact,
 
 
 
+# Stage names reported to the stage callback, in execution order
+TRAINING_PIPELINE_STAGES = ["ingestion", "validation", "transformation", "trainer", "evaluation", "pusher"]
+
+
 class TrainPipeline:
-    def __init__(self):
+    def __init__(self, stage_callback: Optional[Callable[..., None]] = None, in_memory: bool = TRAINING_PIPELINE_IN_MEMORY,
+                 use_stage_cache: bool = TRAINING_PIPELINE_STAGE_CACHE):
+        """
+        :param stage_callback: Optional function called as stage_callback(stage, status, error=None)
+                               whenever a stage starts ("running"), ends ("completed"/"failed")
+                               or is not run ("skipped", or "cached" when its artifact is reused)
+        :param in_memory: Hand DataFrames/arrays to the next stage directly instead of re-reading
+                          them from disk. The artifact files are still written, on a background thread,
+                          and run_pipeline waits for them before returning
+        :param use_stage_cache: Reuse the artifact of an earlier run for every stage up to the trainer whose
+                                inputs (data, schema, code, hyperparameters) are unchanged
+        """
+        self.stage_callback = stage_callback
+        self.in_memory = in_memory
+        self.artifact_writer: Optional[ArtifactWriter] = None
+        self.stage_cache: Optional[StageCache] = StageCache() if use_stage_cache else None
         self.data_ingestion_config = DataIngestionConfig()
         self.data_validation_config= DataValidationConfig()
         self.data_transformation_config = DataTransformationConfig()
@@ -56,7 +85,8 @@ class TrainPipeline:
         try:
             logging.info("Entered the start_data_ingestion method of TrainPipeline class")
             logging.info("Getting the data from the saved csv fetched from DataBricks")
-            data_ingestion = DataIngestion(data_ingestion_config=self.data_ingestion_config)
+            data_ingestion = DataIngestion(data_ingestion_config=self.data_ingestion_config,
+                                           artifact_writer=self.artifact_writer)
             data_ingestion_artifact = data_ingestion.initiate_data_ingestion()
             logging.info("Got the train_set and test_set from Data ")
             logging.info("Exited the start_data_ingestion method of TrainPipeline class")
@@ -98,7 +128,8 @@ class TrainPipeline:
         try:
             data_transformation = dataTransformation(data_ingestion_artifact=data_ingestion_artifact,
                                                      data_transformation_config=self.data_transformation_config,
-                                                     data_validation_artifact=data_validation_artifact)
+                                                     data_validation_artifact=data_validation_artifact,
+                                                     artifact_writer=self.artifact_writer)
             data_transformation_artifact = data_transformation.initiate_data_transformation()
             return data_transformation_artifact
         except Exception as e:
@@ -130,6 +161,9 @@ class TrainPipeline:
         This method of TrainPipeline class is responsible for starting modle evaluation
         """
         try:
+            if self.artifact_writer is not None:
+                # Evaluation workers load the trained model from its file
+                self.artifact_writer.wait()
             model_evaluation = ModelEvaluation(model_eval_config=self.ModelEvaluationConfig,
                                                data_ingestion_artifact=data_ingestion_artifact,
                                                model_trainer_artifact=model_trainer_artifact)
@@ -152,23 +186,125 @@ class TrainPipeline:
             raise MyException(e, sys)      
 
 
+    def _notify_stage(self, stage: str, status: str, error: str = None) -> None:
+        if self.stage_callback is None:
+            return
+        try:
+            self.stage_callback(stage, status, error=error)
+        except Exception as e:
+            logging.warning(f"Stage callback failed for {stage} [{status}]: {e}")
+
+
+    def _run_stage(self, stage: str, stage_fn: Callable, **kwargs):
+        """
+        Runs one pipeline stage and reports its progress to the stage callback
+        """
+        self._notify_stage(stage, "running")
+        try:
+            artifact = stage_fn(**kwargs)
+        except Exception as e:
+            self._notify_stage(stage, "failed", error=str(e))
+            raise
+        self._notify_stage(stage, "completed")
+        return artifact
+
+
+    def _run_cached_stage(self, stage: str, input_fingerprint: str, artifact_cls, stage_fn: Callable,
+                          output_fingerprint_fn: Callable = None,
+                          **kwargs) -> Tuple[object, str]:
+        """
+        Runs one pipeline stage unless the stage cache holds an artifact for the same input fingerprint.
+        Returns the artifact and its output fingerprint, which downstream stages build their own on.
+        :param output_fingerprint_fn: Computes the output fingerprint from the new artifact;
+                                      by default it is the input fingerprint
+        """
+        if self.stage_cache is not None:
+            cached = self.stage_cache.lookup(stage, input_fingerprint, artifact_cls)
+            if cached is not None:
+                logging.info(f"Inputs of {stage} unchanged, reusing cached artifact: {cached[0]}")
+                self._notify_stage(stage, "cached")
+                return cached
+
+        artifact = self._run_stage(stage, stage_fn, **kwargs)
+        output_fingerprint = output_fingerprint_fn(artifact) if output_fingerprint_fn else input_fingerprint
+        if self.stage_cache is not None and artifact is not None:
+            # Goes through the writer queue so the entry is only recorded after the artifact files
+            write_artifact(self.artifact_writer, self.stage_cache.record, stage, input_fingerprint,
+                           artifact, output_fingerprint)
+        return artifact, output_fingerprint
+
+
+    @staticmethod
+    def _ingested_data_fingerprint(data_ingestion_artifact: DataIngestionArtifact) -> str:
+        if data_ingestion_artifact.train_df is not None:
+            return fingerprint(hash_dataframe(data_ingestion_artifact.train_df),
+                               hash_dataframe(data_ingestion_artifact.test_df))
+        return fingerprint(hash_file(data_ingestion_artifact.trained_file_path),
+                           hash_file(data_ingestion_artifact.test_file_path))
+
+
     def run_pipeline(self, ) -> None:
         """
         This method of TrainPipeline class is responsible for running complete pipeline
         """
+        if self.in_memory:
+            self.artifact_writer = ArtifactWriter()
+        run_failed = False
         try:
-            data_ingestion_artifact = self.start_data_ingestion()
-            data_validation_artifact = self.start_data_validation(data_ingestion_artifact=data_ingestion_artifact)
-            data_transformation_artifact = self.start_data_transformation(
-                data_ingestion_artifact=data_ingestion_artifact, data_validation_artifact=data_validation_artifact)
-            model_trainer_artifact = self.start_model_trainer(data_transformation_artifact=data_transformation_artifact)
-            model_evaluation_artifact = self.start_model_evaluation(data_ingestion_artifact=data_ingestion_artifact,
-                                                                    model_trainer_artifact=model_trainer_artifact)
+            # Each fingerprint covers the stage's own code and settings plus the output of the stage before it
+            schema_hash = hash_file(SCHEMA_FILE_PATH)
+            data_ingestion_artifact, ingested_fingerprint = self._run_cached_stage(
+                "ingestion",
+                fingerprint("ingestion", f"{DEFAULT_CATALOG}.{DEFAULT_SCHEMA}.{DEFAULT_TABLE}",
+                            # New rows in the warehouse change the source state and so invalidate the entry
+                            DataIngestion(self.data_ingestion_config).get_source_state(),
+                            config_params(self.data_ingestion_config), hash_source(DataIngestion)),
+                DataIngestionArtifact, self.start_data_ingestion,
+                output_fingerprint_fn=self._ingested_data_fingerprint)
+            data_validation_artifact, _ = self._run_cached_stage(
+                "validation",
+                fingerprint("validation", ingested_fingerprint, schema_hash,
+                            config_params(self.data_validation_config), hash_source(DataValidation),
+                            hash_file(self.data_validation_config.drift_reference_file_path)),
+                DataValidationArtifact, self.start_data_validation,
+                data_ingestion_artifact=data_ingestion_artifact)
+            data_transformation_artifact, transformed_fingerprint = self._run_cached_stage(
+                "transformation",
+                fingerprint("transformation", ingested_fingerprint, schema_hash,
+                            config_params(self.data_transformation_config), hash_source(dataTransformation),
+                            hash_source(BikeFeatureTransformer), hash_source(DateFeatureExtractor)),
+                DataTransformationArtifact, self.start_data_transformation,
+                data_ingestion_artifact=data_ingestion_artifact,
+                data_validation_artifact=data_validation_artifact)
+            model_trainer_artifact, _ = self._run_cached_stage(
+                "trainer",
+                fingerprint("trainer", transformed_fingerprint, config_params(self.model_trainer_config),
+                            hash_file(self.model_trainer_config.model_config_file_path),
+                            hash_source(ModelTrainer), hash_source(ModelSearch), hash_source(MyModel)),
+                ModelTrainerArtifact, self.start_model_trainer,
+                data_transformation_artifact=data_transformation_artifact)
+            # Evaluation compares against the production model in S3, which can change at any time
+            model_evaluation_artifact = self._run_stage("evaluation", self.start_model_evaluation,
+                                                        data_ingestion_artifact=data_ingestion_artifact,
+                                                        model_trainer_artifact=model_trainer_artifact)
             if not model_evaluation_artifact.is_model_accepted:
                 logging.info(f"Model not accepted.")
+                self._notify_stage("pusher", "skipped")
                 return None
-            model_pusher_artifact = self.start_model_pusher(model_evaluation_artifact=model_evaluation_artifact)
+            model_pusher_artifact = self._run_stage("pusher", self.start_model_pusher,
+                                                    model_evaluation_artifact=model_evaluation_artifact)
+            if data_validation_artifact.drift_profile_file_path is not None:
+                # The accepted model's training data is the baseline for the next run's drift check
+                DriftProfile.promote(data_validation_artifact.drift_profile_file_path,
+                                     self.data_validation_config.drift_reference_file_path)
             
         except Exception as e:
+            run_failed = True
             raise MyException(e, sys)
+        finally:
+            if self.artifact_writer is not None:
+                # Keep the on-disk artifacts complete for reproducibility before the run is reported done;
+                # a write error must not replace the stage error that is already propagating
+                artifact_writer, self.artifact_writer = self.artifact_writer, None
+                artifact_writer.close(raise_errors=not run_failed)
 
@@ -0,0 +1,64 @@
+import sys
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, List
+
+from src.exception import MyException
+from src.logger import logging
+
+
+class ArtifactWriter:
+    """
+    Persists pipeline artifacts on a background thread while the next stage works on
+    the in-memory copy. Writes run one at a time, in submission order.
+    """
+
+    def __init__(self):
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="artifact-writer")
+        self._futures: List[Future] = []
+
+    def submit(self, write_fn: Callable, *args, **kwargs) -> None:
+        """
+        Queues write_fn(*args, **kwargs). The caller must not mutate the arguments afterwards.
+        """
+        self._futures.append(self._executor.submit(write_fn, *args, **kwargs))
+
+    def wait(self) -> None:
+        """
+        Blocks until every queued write has finished and raises the first write error.
+        """
+        futures, self._futures = self._futures, []
+        errors = [future.exception() for future in futures]
+        errors = [error for error in errors if error is not None]
+        if errors:
+            logging.error(f"{len(errors)} background artifact write(s) failed")
+            try:
+                raise errors[0]
+            except Exception as e:
+                raise MyException(e, sys) from e
+        logging.info(f"{len(futures)} background artifact write(s) completed")
+
+    def close(self, raise_errors: bool = True) -> None:
+        """
+        Waits for the queued writes and stops the writer thread.
+
+        :param raise_errors: False logs a failed write instead of raising it, for callers that
+            are already propagating an error of their own
+        """
+        try:
+            self.wait()
+        except Exception as e:
+            if raise_errors:
+                raise
+            logging.error(f"Background artifact write failed while handling another error: {e}")
+        finally:
+            self._executor.shutdown(wait=True)
+
+
+def write_artifact(artifact_writer: ArtifactWriter, write_fn: Callable, *args, **kwargs) -> None:
+    """
+    Runs write_fn through artifact_writer when one is given, otherwise writes synchronously.
+    """
+    if artifact_writer is None:
+        write_fn(*args, **kwargs)
+    else:
+        artifact_writer.submit(write_fn, *args, **kwargs)
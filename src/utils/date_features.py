@@ -0,0 +1,95 @@
+import sys
+import threading
+from typing import Dict, Iterable, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.constants import DATA_INGESTION_DATE_FORMAT
+from src.exception import MyException
+
+
+# Features DateFeatureExtractor can emit, in the column order of its parsed cache
+DATE_FEATURE_NAMES: Tuple[str, ...] = ("month", "day", "dayofweek", "is_weekend")
+
+
+class DateFeatureExtractor:
+    """
+    Parses date strings of one known format into integer date features.
+
+    Hourly data repeats each date string many times, so every call factorizes the column and
+    parses each distinct string once; the row features are then gathered through the integer codes.
+    Parsed strings are also kept across calls (streamed batches, serving requests), up to
+    max_cache_size entries.
+    """
+
+    def __init__(self, date_format: str = DATA_INGESTION_DATE_FORMAT, max_cache_size: int = 100_000):
+        """
+        :param date_format: strptime format of the date strings, e.g. "%d/%m/%Y"
+        :param max_cache_size: Distinct date strings kept parsed between calls
+        """
+        self.date_format = date_format
+        self.max_cache_size = max_cache_size
+        self._cache: Dict[str, np.ndarray] = {}
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        # The parse cache is rebuilt on demand, do not persist it with a pickled model
+        return {"date_format": self.date_format, "max_cache_size": self.max_cache_size}
+
+    def __setstate__(self, state):
+        self.__init__(**state)
+
+    def _parse_uniques(self, uniques: np.ndarray) -> np.ndarray:
+        """
+        Returns an int16 matrix with one DATE_FEATURE_NAMES row per unique string.
+        """
+        cache = self._cache
+        features = np.empty((len(uniques), len(DATE_FEATURE_NAMES)), dtype=np.int16)
+        missing = []
+        for index, value in enumerate(uniques):
+            row = cache.get(value)
+            if row is None:
+                missing.append(index)
+            else:
+                features[index] = row
+        if missing:
+            parsed = pd.DatetimeIndex(pd.to_datetime(uniques[missing], format=self.date_format))
+            dayofweek = parsed.dayofweek.to_numpy()
+            parsed_features = np.column_stack([parsed.month.to_numpy(), parsed.day.to_numpy(),
+                                               dayofweek, dayofweek >= 5]).astype(np.int16)
+            with self._lock:
+                if len(cache) + len(missing) > self.max_cache_size:
+                    cache.clear()
+                for index, row in zip(missing, parsed_features):
+                    cache[uniques[index]] = row
+            features[missing] = parsed_features
+        return features
+
+    def transform(self, dates, features: Iterable[str] = ("month", "day")) -> Dict[str, np.ndarray]:
+        """
+        :param dates: Date strings (Series or array); missing dates give 0 for every feature
+        :param features: Names from DATE_FEATURE_NAMES to return
+        :return: {feature: int16 array with one value per row}
+        """
+        try:
+            codes, uniques = pd.factorize(pd.Series(dates, copy=False).astype(object))
+            unique_features = self._parse_uniques(np.asarray(uniques, dtype=object))
+            # Code -1 (missing date) selects the appended all-zero row
+            unique_features = np.vstack([unique_features, np.zeros((1, len(DATE_FEATURE_NAMES)), dtype=np.int16)])
+            row_features = unique_features[codes]
+            return {name: row_features[:, DATE_FEATURE_NAMES.index(name)] for name in features}
+        except Exception as e:
+            raise MyException(e, sys) from e
+
+    def parse(self, dates: pd.Series) -> pd.Series:
+        """
+        Parses date strings to datetime64 values, one strptime call per distinct string.
+        """
+        try:
+            codes, uniques = pd.factorize(dates)
+            parsed = pd.to_datetime(pd.Series(uniques, dtype=object), format=self.date_format).to_numpy()
+            values = np.append(parsed, np.datetime64("NaT"))[codes]
+            return pd.Series(values, index=dates.index, name=dates.name)
+        except Exception as e:
+            raise MyException(e, sys) from e
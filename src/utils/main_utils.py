@@ -5,6 +5,7 @@ import sys
 import numpy as np
 import dill
 import yaml
+import pandas as pd
 from pandas import DataFrame
 
 
@@ -58,34 +59,157 @@ def save_numpy_array_data(file_path: str, array: np.array):
     """
     Save numpy array data to file
     file_path: str location of file to save
-    array: np.array data to save
+    array: np.array data to save, written C-contiguous so it can be memory-mapped back
     """
     try:
         dir_path = os.path.dirname(file_path)
         os.makedirs(dir_path, exist_ok=True)
-        with open(file_path, 'wb') as file_obj:
-            np.save(file_obj, array)
+        np.save(file_path, np.ascontiguousarray(array))
     except Exception as e:
         raise MyException(e, sys) from e
 
 
 
 
-def load_numpy_array_data(file_path: str) -> np.array:
+def load_numpy_array_data(file_path: str, mmap_mode: str = None) -> np.array:
     """
     load numpy array data from file
     file_path: str location of file to load
+    mmap_mode: "r" maps the file read-only instead of reading it; processes mapping the same
+               file share its pages and slices are views
     return: np.array data loaded
     """
     try:
-        with open(file_path, 'rb') as file_obj:
-            return np.load(file_obj)
+        return np.load(file_path, mmap_mode=mmap_mode)
     except Exception as e:
         raise MyException(e, sys) from e
 
 
 
 
+def get_file_format(file_path: str) -> str:
+    """
+    Returns the data file format ("parquet" or "csv") from the file extension
+    """
+    return "parquet" if file_path.endswith(".parquet") else "csv"
+
+
+
+
+def write_dataframe(dataframe: DataFrame, file_path: str, file_format: str = None) -> None:
+    """
+    Write a DataFrame as parquet (typed, columnar) or csv
+    file_path: str location of file to save
+    file_format: str "parquet" or "csv", inferred from the extension if None
+    """
+    try:
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        file_format = file_format or get_file_format(file_path)
+        if file_format == "parquet":
+            dataframe.to_parquet(file_path, index=False)
+        else:
+            dataframe.to_csv(file_path, index=False, header=True)
+    except Exception as e:
+        raise MyException(e, sys) from e
+
+
+
+
+def read_dataframe(file_path: str, file_format: str = None, columns: list = None) -> DataFrame:
+    """
+    Read a DataFrame written by write_dataframe
+    file_path: str location of file to load
+    file_format: str "parquet" or "csv", inferred from the extension if None
+    columns: list only read these columns (parquet reads nothing else from disk)
+    """
+    try:
+        file_format = file_format or get_file_format(file_path)
+        if file_format == "parquet":
+            dataframe = pd.read_parquet(file_path, columns=columns)
+            # Row groups can list categories in different orders; sort them so get_dummies
+            # produces the same columns as it does for csv string columns
+            for column in dataframe.select_dtypes(include="category").columns:
+                dataframe[column] = dataframe[column].cat.reorder_categories(
+                    sorted(dataframe[column].cat.categories))
+            return dataframe
+        return pd.read_csv(file_path, usecols=columns)
+    except Exception as e:
+        raise MyException(e, sys) from e
+
+
+
+
+def iter_dataframe_batches(file_path: str, file_format: str = None, batch_size: int = 100_000, columns: list = None):
+    """
+    Yield a data file as DataFrames of at most batch_size rows, so it never has to fit in memory at once
+    """
+    try:
+        file_format = file_format or get_file_format(file_path)
+        if file_format == "parquet":
+            import pyarrow.parquet as pq
+            for record_batch in pq.ParquetFile(file_path).iter_batches(batch_size=batch_size, columns=columns):
+                yield record_batch.to_pandas()
+        else:
+            yield from pd.read_csv(file_path, usecols=columns, chunksize=batch_size)
+    except Exception as e:
+        raise MyException(e, sys) from e
+
+
+
+
+def read_dataframe_schema(file_path: str, file_format: str = None) -> DataFrame:
+    """
+    Return an empty DataFrame with the columns and dtypes of a data file, without reading its rows
+    """
+    try:
+        file_format = file_format or get_file_format(file_path)
+        if file_format == "parquet":
+            import pyarrow.parquet as pq
+            return pq.read_schema(file_path).empty_table().to_pandas()
+        return pd.read_csv(file_path, nrows=0)
+    except Exception as e:
+        raise MyException(e, sys) from e
+
+
+
+
+class DataFrameAppender:
+    """
+    Appends DataFrame batches to one parquet or csv file. Parquet batches are written as
+    row groups and cast to the schema of the first batch.
+    """
+    def __init__(self, file_path: str, file_format: str = None):
+        self.file_path = file_path
+        self.file_format = file_format or get_file_format(file_path)
+        self._writer = None
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        if os.path.exists(file_path):
+            os.remove(file_path)
+
+    def append(self, dataframe: DataFrame) -> None:
+        try:
+            if self.file_format == "parquet":
+                import pyarrow as pa
+                import pyarrow.parquet as pq
+                if self._writer is None:
+                    table = pa.Table.from_pandas(dataframe, preserve_index=False)
+                    self._writer = pq.ParquetWriter(self.file_path, table.schema)
+                else:
+                    table = pa.Table.from_pandas(dataframe, schema=self._writer.schema, preserve_index=False)
+                self._writer.write_table(table)
+            else:
+                dataframe.to_csv(self.file_path, mode="a", index=False, header=not os.path.exists(self.file_path))
+        except Exception as e:
+            raise MyException(e, sys) from e
+
+    def close(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+
+
+
 def save_object(file_path: str, obj: object) -> None:
     logging.info("Entered the save_object method of utils")
 
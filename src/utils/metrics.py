@@ -0,0 +1,40 @@
+import sys
+from typing import Optional
+
+import numpy as np
+
+from src.entity.artifact_entity import RegressorMetricArtifact
+from src.exception import MyException
+
+
+def regression_metrics(model: object, features: np.ndarray, target: np.ndarray, chunk_rows: int = 100_000,
+                       validation_R2_score: Optional[float] = None,
+                       validation_source: Optional[str] = None) -> RegressorMetricArtifact:
+    """
+    Scores model on (features, target) in a single prediction pass, chunk by chunk so memory-mapped
+    inputs are never fully copied, and returns R2, RMSE and MAE in a RegressorMetricArtifact.
+
+    :param validation_R2_score: Out-of-sample R2 already known from training, stored alongside
+    :param validation_source: Where validation_R2_score comes from ("oob", "validation_fold", "cv")
+    """
+    try:
+        n_rows, target_sum, target_square_sum, squared_error, absolute_error = 0, 0.0, 0.0, 0.0, 0.0
+        for start in range(0, len(target), chunk_rows):
+            y_true = np.asarray(target[start:start + chunk_rows], dtype=np.float64)
+            y_pred = np.asarray(model.predict(features[start:start + chunk_rows]), dtype=np.float64)
+            error = y_true - y_pred
+            n_rows += len(y_true)
+            target_sum += y_true.sum()
+            target_square_sum += np.square(y_true).sum()
+            squared_error += np.square(error).sum()
+            absolute_error += np.abs(error).sum()
+        total = target_square_sum - target_sum * target_sum / n_rows
+        return RegressorMetricArtifact(
+            R2_score=float(1.0 - squared_error / total) if total > 0 else 0.0,
+            rmse=float(np.sqrt(squared_error / n_rows)),
+            mae=float(absolute_error / n_rows),
+            validation_R2_score=None if validation_R2_score is None else float(validation_R2_score),
+            validation_source=validation_source,
+        )
+    except Exception as e:
+        raise MyException(e, sys) from e